@@ -2,7 +2,7 @@ import datetime
 import mock
 import unittest
 
-from xlfunctions import date, xlerrors
+from xlfunctions import date, xl, xlerrors
 
 dt = datetime.datetime
 
@@ -58,6 +58,14 @@ class DateModuleTest(unittest.TestCase):
         with mock.patch.object(date, 'now', lambda: dt(2000, 1, 1)):
             self.assertEqual(date.TODAY(), dt(2000, 1, 1))
 
+    def test_TODAY_is_not_cached(self):
+        cache = xl.FunctionCache(maxsize=10)
+        with mock.patch.object(xl, 'FUNCTION_CACHE', cache):
+            with mock.patch.object(date, 'now', lambda: dt(2000, 1, 1)):
+                date.TODAY()
+            with mock.patch.object(date, 'now', lambda: dt(2000, 1, 2)):
+                self.assertEqual(date.TODAY(), dt(2000, 1, 2))
+
     def test_YEARFRAC_start_date_must_be_datetime(self):
         self.assertIsInstance(
             date.YEARFRAC('bad', 1), xlerrors.ValueExcelError)
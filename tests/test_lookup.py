@@ -1,6 +1,9 @@
+import datetime
+import mock
+import numpy
 import unittest
 
-from xlfunctions import lookup, xlerrors, xltypes
+from xlfunctions import lookup, xl, xlerrors, xltypes
 
 
 class LookupModuleTest(unittest.TestCase):
@@ -27,10 +30,33 @@ class LookupModuleTest(unittest.TestCase):
             [106, 'Sousa', 'Luis'],
         ])
         self.assertEqual(lookup.VLOOKUP(102, range1, 2, False), 'Fortana')
+        self.assertEqual(lookup.VLOOKUP(102, range1, 3, False), 'Olivier')
+
+    def test_VLOOOKUP_with_too_small_col_index_num(self):
+        range1 = xltypes.Array([
+            [101, 'Davis', 'Sara'],
+        ])
+        self.assertIsInstance(
+            lookup.VLOOKUP(101, range1, 0, False), xlerrors.ValueExcelError)
 
     def test_VLOOOKUP_with_range_lookup(self):
-        with self.assertRaises(NotImplementedError):
-            lookup.VLOOKUP(1, xltypes.Array([[]]), 2, True)
+        # Tax brackets.
+        range1 = xltypes.Array([
+            [0, 0.1], [10000, 0.2], [50000, 0.3], [50000, 0.35],
+            ['a', 'text'], [True, 'boolean']
+        ])
+        self.assertEqual(lookup.VLOOKUP(0, range1, 2, True), 0.1)
+        self.assertEqual(lookup.VLOOKUP(9999, range1, 2, True), 0.1)
+        self.assertEqual(lookup.VLOOKUP(10000, range1, 2, True), 0.2)
+        # The last of equal values is used.
+        self.assertEqual(lookup.VLOOKUP(1e6, range1, 2, True), 0.35)
+        # Only values of the same type are considered.
+        self.assertEqual(lookup.VLOOKUP('b', range1, 2, True), 'text')
+        self.assertEqual(lookup.VLOOKUP(True, range1, 2, True), 'boolean')
+        self.assertIsInstance(
+            lookup.VLOOKUP(-1, range1, 2, True), xlerrors.NaExcelError)
+        self.assertIsInstance(
+            lookup.VLOOKUP('0', range1, 2, True), xlerrors.NaExcelError)
 
     def test_VLOOOKUP_with_oversized_col_index_num(self):
         # Excel Doc example.
@@ -46,3 +72,334 @@ class LookupModuleTest(unittest.TestCase):
         ])
         self.assertIsInstance(
             lookup.VLOOKUP(102, range1, 2, False), xlerrors.NaExcelError)
+
+    def test_VLOOOKUP_is_case_insensitive(self):
+        range1 = xltypes.Array([['Abc', 1], ['abc', 2]])
+        self.assertEqual(lookup.VLOOKUP('ABC', range1, 2, False), 1)
+
+    def test_VLOOOKUP_does_not_convert_types(self):
+        range1 = xltypes.Array([['1', 'text'], [True, 'boolean'], [1, 'one']])
+        self.assertEqual(lookup.VLOOKUP(1, range1, 2, False), 'one')
+        self.assertEqual(lookup.VLOOKUP('1', range1, 2, False), 'text')
+        self.assertEqual(lookup.VLOOKUP(True, range1, 2, False), 'boolean')
+        self.assertIsInstance(
+            lookup.VLOOKUP(False, range1, 2, False), xlerrors.NaExcelError)
+
+    def test_VLOOOKUP_with_date(self):
+        date = datetime.datetime(2020, 5, 28)
+        range1 = xltypes.Array([[date, 'date']])
+        self.assertEqual(lookup.VLOOKUP(date, range1, 2, False), 'date')
+
+    def test_VLOOOKUP_returns_first_match(self):
+        range1 = xltypes.Array([[1, 'a'], [2, 'b'], [1, 'c']])
+        self.assertEqual(lookup.VLOOKUP(1, range1, 2, False), 'a')
+
+    def test_VLOOOKUP_with_array_lookup_value(self):
+        range1 = xltypes.Array([
+            [101, 'Davis'], ['b', xlerrors.DivZeroExcelError()], [103, None],
+            [True, 4.5]
+        ])
+        result = lookup.VLOOKUP(
+            xltypes.Array([
+                [103, 'B', 102], [True, xlerrors.RefExcelError(), 101]]),
+            range1, 2, False)
+        self.assertIsInstance(result, xltypes.Array)
+        values = result.values.tolist()
+        self.assertIsInstance(values[0][0], xltypes.Blank)
+        self.assertIsInstance(values[0][1], xlerrors.DivZeroExcelError)
+        self.assertIsInstance(values[0][2], xlerrors.NaExcelError)
+        self.assertEqual(values[1][0], 4.5)
+        self.assertIsInstance(values[1][1], xlerrors.RefExcelError)
+        self.assertEqual(values[1][2], 'Davis')
+
+    def test_VLOOOKUP_with_array_lookup_value_and_range_lookup(self):
+        range1 = xltypes.Array([[0, 'low'], [10, 'mid'], [20, 'high']])
+        result = lookup.VLOOKUP(
+            xltypes.Array([[-1], [5], [10], [25]]), range1, 2, True)
+        self.assertEqual(
+            result.values.tolist()[1:], [['low'], ['mid'], ['high']])
+        self.assertIsInstance(result.values[0][0], xlerrors.NaExcelError)
+
+    def test_VLOOOKUP_with_array_lookup_value_and_dates(self):
+        noon = datetime.datetime(2020, 1, 1, 12)
+        result = lookup.VLOOKUP(
+            xltypes.Array([[1], [2]]),
+            xltypes.Array([[1, noon], [2, 'a']]), 2, False)
+        self.assertEqual(
+            [cell.value for cell in result.flat], [noon, 'a'])
+
+    def test_XLOOKUP(self):
+        lookup_array = xltypes.Array([['a'], ['b'], ['c'], ['B']])
+        return_array = xltypes.Array([[1, 'x'], [2, 'y'], [3, 'z'], [4, 'w']])
+        self.assertEqual(
+            lookup.XLOOKUP(
+                'B', lookup_array, xltypes.Array([[1], [2], [3], [4]])),
+            2)
+        self.assertEqual(
+            lookup.XLOOKUP('c', lookup_array, return_array).values.tolist(),
+            [[3, 'z']])
+        self.assertIsInstance(
+            lookup.XLOOKUP('d', lookup_array, return_array),
+            xlerrors.NaExcelError)
+        self.assertEqual(
+            lookup.XLOOKUP('d', lookup_array, return_array, 'none'), 'none')
+
+    def test_XLOOKUP_in_row(self):
+        self.assertEqual(
+            lookup.XLOOKUP(
+                2, xltypes.Array([[1, 2, 3]]),
+                xltypes.Array([['a', 'b', 'c'], ['d', 'e', 'f']])
+            ).values.tolist(),
+            [['b'], ['e']])
+
+    def test_XLOOKUP_with_match_mode(self):
+        lookup_array = xltypes.Array([[10], [30], [20], [20]])
+        return_array = xltypes.Array([[1], [2], [3], [4]])
+        self.assertEqual(
+            lookup.XLOOKUP(25, lookup_array, return_array, None, -1), 3)
+        self.assertEqual(
+            lookup.XLOOKUP(20, lookup_array, return_array, None, -1), 3)
+        self.assertEqual(
+            lookup.XLOOKUP(25, lookup_array, return_array, None, 1), 2)
+        self.assertIsInstance(
+            lookup.XLOOKUP(35, lookup_array, return_array, None, 1),
+            xlerrors.NaExcelError)
+        self.assertIsInstance(
+            lookup.XLOOKUP(35, lookup_array, return_array, None, 2),
+            xlerrors.ValueExcelError)
+
+    def test_XLOOKUP_with_match_mode_returns_first_item(self):
+        lookup_array = xltypes.Array([[1], [1], [5], [5]])
+        return_array = xltypes.Array([['a'], ['b'], ['c'], ['d']])
+        self.assertEqual(
+            lookup.XLOOKUP(3, lookup_array, return_array, None, -1), 'a')
+        self.assertEqual(
+            lookup.XLOOKUP(3, lookup_array, return_array, None, 1), 'c')
+        self.assertEqual(
+            lookup.XLOOKUP(
+                xltypes.Array([[3], [0], [9]]), lookup_array, return_array,
+                '-', -1).flat,
+            ['a', '-', 'c'])
+        self.assertEqual(
+            lookup.XLOOKUP(
+                xltypes.Array([[3], [0], [9]]), lookup_array, return_array,
+                '-', 1).flat,
+            ['c', 'a', '-'])
+
+    def test_XLOOKUP_with_array_lookup_value(self):
+        lookup_array = xltypes.Array([[10], [30], [20]])
+        return_array = xltypes.Array([['a'], ['b'], ['c']])
+        keys = xltypes.Array([[20, 40], [5, 10]])
+        self.assertEqual(
+            lookup.XLOOKUP(keys, lookup_array, return_array, '-')
+            .values.tolist(),
+            [['c', '-'], ['-', 'a']])
+        self.assertEqual(
+            lookup.XLOOKUP(keys, lookup_array, return_array, '-', -1)
+            .values.tolist(),
+            [['c', 'b'], ['-', 'a']])
+
+    def test_XLOOKUP_with_array_lookup_value_and_dates(self):
+        noon = datetime.datetime(2020, 1, 1, 12)
+        result = lookup.XLOOKUP(
+            xltypes.Array([['b'], ['a']]), xltypes.Array([['a'], ['b']]),
+            xltypes.Array([[noon], [1]]))
+        self.assertEqual([cell.value for cell in result.flat], [1, noon])
+        self.assertIsInstance(result.flat[0].value, int)
+
+    def test_XLOOKUP_with_invalid_arrays(self):
+        self.assertIsInstance(
+            lookup.XLOOKUP(
+                1, xltypes.Array([[1, 2], [3, 4]]), xltypes.Array([[1, 2]])),
+            xlerrors.ValueExcelError)
+        self.assertIsInstance(
+            lookup.XLOOKUP(
+                1, xltypes.Array([[1], [2]]), xltypes.Array([[1]])),
+            xlerrors.ValueExcelError)
+        self.assertIsInstance(
+            lookup.XLOOKUP(
+                xltypes.Array([[1]]), xltypes.Array([[1], [2]]),
+                xltypes.Array([[1, 2], [3, 4]])),
+            xlerrors.ValueExcelError)
+
+    def test_INDEX(self):
+        range1 = xltypes.Array([['a', 'b'], ['c', 'd'], ['e', 'f']])
+        self.assertEqual(lookup.INDEX(range1, 2, 2), 'd')
+        self.assertEqual(
+            lookup.INDEX(range1, 2).values.tolist(), [['c', 'd']])
+        self.assertEqual(
+            lookup.INDEX(range1, 0, 2).values.tolist(), [['b'], ['d'], ['f']])
+        self.assertIs(lookup.INDEX(range1, 0, 0), range1)
+        self.assertIsInstance(
+            lookup.INDEX(range1, 4, 1), xlerrors.RefExcelError)
+        self.assertIsInstance(
+            lookup.INDEX(range1, 1, 3), xlerrors.RefExcelError)
+        self.assertIsInstance(
+            lookup.INDEX(range1, -1, 1), xlerrors.ValueExcelError)
+
+    def test_INDEX_with_vector(self):
+        self.assertEqual(lookup.INDEX(xltypes.Array([[1, 2, 3]]), 2), 2)
+        self.assertEqual(lookup.INDEX(xltypes.Array([[1], [2], [3]]), 3), 3)
+
+    def test_INDEX_shares_cells(self):
+        range1 = xltypes.NumpyArray.from_numbers(
+            numpy.arange(12).reshape(4, 3))
+        column = lookup.INDEX(range1, 0, 2)
+        self.assertTrue(numpy.shares_memory(
+            column.buffer.numbers, range1.buffer.numbers))
+        self.assertEqual(column.flat, [1, 4, 7, 10])
+        # No cells of the table were created.
+        self.assertIsNone(range1._values)
+        range1.values
+        column = lookup.INDEX(range1, 0, 2)
+        self.assertTrue(numpy.shares_memory(column.values, range1.values))
+
+    def test_INDEX_with_dates(self):
+        noon = datetime.datetime(2020, 1, 1, 12)
+        range1 = xltypes.Array([[1, noon], [2, 'a']])
+        self.assertEqual(
+            [cell.value for cell in lookup.INDEX(range1, 0, 2).flat],
+            [noon, 'a'])
+        self.assertEqual(
+            [cell.value for cell in lookup.INDEX(range1, 1, 0).flat],
+            [1, noon])
+
+    def test_INDEX_MATCH(self):
+        range1 = xltypes.Array([[101, 'Davis'], [102, 'Fortana']])
+        self.assertEqual(
+            lookup.INDEX(
+                range1, lookup.MATCH(102, lookup.INDEX(range1, 0, 1), 0), 2),
+            'Fortana')
+        result = lookup.INDEX(
+            range1,
+            lookup.MATCH(
+                xltypes.Array([[102], [103], [101]]),
+                lookup.INDEX(range1, 0, 1), 0),
+            2)
+        values = result.values.tolist()
+        self.assertEqual(values[0][0], 'Fortana')
+        self.assertIsInstance(values[1][0], xlerrors.NaExcelError)
+        self.assertEqual(values[2][0], 'Davis')
+
+    def test_INDEX_with_array_out_of_range(self):
+        result = lookup.INDEX(
+            xltypes.Array([[1], [2]]), xltypes.Array([[0, 1, 3]]))
+        values = result.values.tolist()
+        self.assertIsInstance(values[0][0], xlerrors.RefExcelError)
+        self.assertEqual(values[0][1], 1)
+        self.assertIsInstance(values[0][2], xlerrors.RefExcelError)
+
+    def test_HLOOKUP(self):
+        range1 = xltypes.Array([
+            ['Axles', 'Bearings', 'Bolts'],
+            [4, 4, 9],
+            [5, 7, 10],
+        ])
+        self.assertEqual(lookup.HLOOKUP('axles', range1, 2, False), 4)
+        self.assertEqual(lookup.HLOOKUP('Bolts', range1, 3, False), 10)
+        self.assertEqual(lookup.HLOOKUP('B', range1, 3, True), 5)
+        self.assertIsInstance(
+            lookup.HLOOKUP('B', range1, 3, False), xlerrors.NaExcelError)
+
+    def test_HLOOKUP_with_invalid_row_index_num(self):
+        range1 = xltypes.Array([['a', 'b'], [1, 2]])
+        self.assertIsInstance(
+            lookup.HLOOKUP('a', range1, 0, False), xlerrors.ValueExcelError)
+        self.assertIsInstance(
+            lookup.HLOOKUP('a', range1, 3, False), xlerrors.ValueExcelError)
+
+    def test_MATCH(self):
+        range1 = xltypes.Array([[25], [38], [40], [41]])
+        self.assertEqual(lookup.MATCH(39, range1), 2)
+        self.assertEqual(lookup.MATCH(41, range1, 0), 4)
+        self.assertEqual(lookup.MATCH(41, range1, 2), 4)
+        self.assertIsInstance(
+            lookup.MATCH(39, range1, 0), xlerrors.NaExcelError)
+
+    def test_MATCH_with_array_lookup_value(self):
+        result = lookup.MATCH(
+            xltypes.Array([['b', 'd'], [xlerrors.NullExcelError(), 'A']]),
+            xltypes.Array([['a', 'b', 'c']]), 0)
+        values = result.values.tolist()
+        self.assertEqual(values[0][0], 2)
+        self.assertIsInstance(values[0][1], xlerrors.NaExcelError)
+        self.assertIsInstance(values[1][0], xlerrors.NullExcelError)
+        self.assertEqual(values[1][1], 1)
+
+    def test_MATCH_descending(self):
+        range1 = xltypes.Array([[41, 40, 38, 25]])
+        self.assertEqual(lookup.MATCH(39, range1, -1), 2)
+        self.assertEqual(lookup.MATCH(40, range1, -1), 2)
+        self.assertIsInstance(
+            lookup.MATCH(42, range1, -1), xlerrors.NaExcelError)
+
+    def test_MATCH_with_table(self):
+        self.assertIsInstance(
+            lookup.MATCH(1, xltypes.Array([[1, 2], [3, 4]])),
+            xlerrors.NaExcelError)
+
+
+class LookupIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = xl.LRUCache(maxsize=2)
+        patcher = mock.patch('xlfunctions.lookup.LOOKUP_INDEXES', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_find(self):
+        index = lookup.lookup_index(xltypes.Array([
+            [1, 'x'], ['A', 'y'], [None, 'z'], [False, 'w'], ['a', 'v'],
+            [xlerrors.NaExcelError(), 'u']
+        ]))
+        self.assertEqual(index.find(xltypes.Number(1)), 0)
+        self.assertEqual(index.find(xltypes.Text('a')), 1)
+        self.assertEqual(index.find(xltypes.Boolean(False)), 3)
+        self.assertIsNone(index.find(xltypes.Number(0)))
+        self.assertIsNone(index.find(xltypes.BLANK))
+        with self.assertRaises(xlerrors.NaExcelError):
+            index.find(xlerrors.NaExcelError())
+
+    def test_find_in_row(self):
+        index = lookup.lookup_index(
+            xltypes.Array([[1, 'a', 2], [3, 4, 5]]), axis=1)
+        self.assertEqual(index.find(xltypes.Number(2)), 2)
+        self.assertIsNone(index.find(xltypes.Number(3)))
+
+    def test_frozen_arrays_share_index(self):
+        index = lookup.lookup_index(xltypes.Array([[1], [2]]).freeze())
+        self.assertIs(
+            lookup.lookup_index(xltypes.Array([[1], [2]]).freeze()), index)
+        self.assertIsNot(
+            lookup.lookup_index(xltypes.Array([[1], [2]]).freeze(), axis=1),
+            index)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_unfrozen_arrays_are_not_cached(self):
+        lookup.lookup_index(xltypes.DataFrameArray([[1], [2]]))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_find_sorted(self):
+        index = lookup.lookup_index(xltypes.Array([
+            [1], [3], [3], [5], ['b'], ['D'], [False], [True]]))
+        self.assertIsNone(index.find_sorted(xltypes.Number(0)))
+        self.assertEqual(index.find_sorted(xltypes.Number(3)), 2)
+        self.assertEqual(index.find_sorted(xltypes.Number(4)), 2)
+        self.assertEqual(index.find_sorted(xltypes.Number(6)), 3)
+        self.assertEqual(index.find_sorted(xltypes.Text('c')), 4)
+        self.assertEqual(index.find_sorted(xltypes.Text('Z')), 5)
+        self.assertIsNone(index.find_sorted(xltypes.Text('a')))
+        self.assertEqual(index.find_sorted(xltypes.Boolean(False)), 6)
+        self.assertEqual(index.find_sorted(xltypes.Number(2), -1), 2)
+        self.assertIsNone(index.find_sorted(xltypes.Number(6), -1))
+
+    def test_find_many(self):
+        index = lookup.lookup_index(xltypes.Array([
+            [1], ['A'], [3], ['a'], [1], [True]]))
+        positions, codes = index.find_many(xltypes.Array([
+            [1, 'a', 2], [False, None, xlerrors.NaExcelError()]]).buffer)
+        self.assertEqual(positions.tolist(), [0, 1, -1, -1, -1, -1])
+        self.assertEqual(codes.tolist(), [-1, -1, -1, -1, -1, 6])
+        positions, codes = index.find_many(
+            xltypes.Array([[0, 2, 4]]).buffer, 1)
+        self.assertEqual(positions.tolist(), [-1, 4, 2])
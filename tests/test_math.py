@@ -1,3 +1,4 @@
+import numpy
 import unittest
 
 from xlfunctions import math, xlerrors, xltypes
@@ -12,12 +13,23 @@ class DateModuleTest(unittest.TestCase):
     def test_ABS_with_bad_arg(self):
         self.assertIsInstance(math.ABS('bad'), xlerrors.ValueExcelError)
 
+    def test_ABS_with_array(self):
+        self.assertEqual(
+            math.ABS(xltypes.Array([[-1, 2], ['-3', None]])).flat,
+            [1, 2, 3, 0])
+
     def test_LN(self):
         self.assertEqual(math.LN(2.718281828459045), 1)
 
     def test_LN_with_bad_arg(self):
         self.assertIsInstance(math.LN('bad'), xlerrors.ValueExcelError)
 
+    def test_LN_with_array(self):
+        res = math.LN(xltypes.Array([[1, 0, -1]]))
+        self.assertEqual(res.flat[0], 0)
+        self.assertIsInstance(res.flat[1], xlerrors.NumExcelError)
+        self.assertIsInstance(res.flat[2], xlerrors.NumExcelError)
+
     def test_MOD(self):
         self.assertEqual(math.MOD(1, 2), 1)
 
@@ -31,6 +43,11 @@ class DateModuleTest(unittest.TestCase):
         self.assertIsInstance(math.MOD('bad', 2), xlerrors.ValueExcelError)
         self.assertIsInstance(math.MOD(1, 'bad'), xlerrors.ValueExcelError)
 
+    def test_MOD_with_array(self):
+        res = math.MOD(xltypes.Array([[5, -5, 5]]), xltypes.Array([[3, 3, 0]]))
+        self.assertEqual(res.flat[:2], [2, 1])
+        self.assertIsInstance(res.flat[2], xlerrors.DivZeroExcelError)
+
     def test_PI(self):
         self.assertEqual(math.PI(), 3.141592653589793)
 
@@ -43,6 +60,16 @@ class DateModuleTest(unittest.TestCase):
         self.assertIsInstance(math.POWER('bad', 2), xlerrors.ValueExcelError)
         self.assertIsInstance(math.POWER(10, 'bad'), xlerrors.ValueExcelError)
 
+    def test_POWER_with_array(self):
+        res = math.POWER(
+            xltypes.Array([[2, 3]]), xltypes.Array([[2], [3]]))
+        self.assertEqual(res.values.tolist(), [[4, 9], [8, 27]])
+
+    def test_POWER_with_array_and_bad_values(self):
+        res = math.POWER(xltypes.Array([[0, -8]]), xltypes.Array([[-1, 0.5]]))
+        self.assertIsInstance(res.flat[0], xlerrors.DivZeroExcelError)
+        self.assertIsInstance(res.flat[1], xlerrors.NumExcelError)
+
     def test_ROUND(self):
         self.assertEqual(math.ROUND(0.6), 1)
         self.assertEqual(math.ROUND(1.3), 1)
@@ -54,6 +81,16 @@ class DateModuleTest(unittest.TestCase):
         self.assertIsInstance(
             math.ROUND(1.3, 'bad'), xlerrors.ValueExcelError)
 
+    def test_ROUND_with_array(self):
+        res = math.ROUND(xltypes.Array([[2.675, -2.5, 1234.5]]), 2)
+        self.assertEqual(res.flat, [2.68, -2.5, 1234.5])
+        res = math.ROUND(xltypes.Array([[2.675, -2.5, 1234.5]]))
+        self.assertEqual(res.flat, [3, -3, 1235])
+
+    def test_ROUND_with_array_of_digits(self):
+        res = math.ROUND(1234.567, xltypes.Array([[2, 0, -2]]))
+        self.assertEqual(res.flat, [1234.57, 1235, 1200])
+
     def test_ROUNDUP(self):
         self.assertEqual(math.ROUNDUP(0.6), 1)
         self.assertEqual(math.ROUNDUP(1.3), 2)
@@ -65,6 +102,10 @@ class DateModuleTest(unittest.TestCase):
         self.assertIsInstance(
             math.ROUNDUP(1.3, 'bad'), xlerrors.ValueExcelError)
 
+    def test_ROUNDUP_with_array(self):
+        res = math.ROUNDUP(xltypes.Array([[1.21, -1.21]]), 1)
+        self.assertEqual(res.flat, [1.3, -1.3])
+
     def test_ROUNDDOWN(self):
         self.assertEqual(math.ROUNDDOWN(0.6), 0)
         self.assertEqual(math.ROUNDDOWN(1.3), 1)
@@ -76,6 +117,34 @@ class DateModuleTest(unittest.TestCase):
         self.assertIsInstance(
             math.ROUNDDOWN(1.3, 'bad'), xlerrors.ValueExcelError)
 
+    def test_ROUNDDOWN_with_array(self):
+        res = math.ROUNDDOWN(xltypes.Array([[1.29, -1.29]]), 1)
+        self.assertEqual(res.flat, [1.2, -1.2])
+
+    def test_rounding_with_array_matches_scalars(self):
+        numbers = [
+            76.49, 1.9999999999, 1.0000000001, 0.4999999999, 2.675, 0.29,
+            -1.005, 123456.1234567895, 4.48, 4503599627370495.5, 1e20]
+        rng = numpy.random.default_rng(0)
+        numbers += [
+            round(number, digits) for number, digits in zip(
+                rng.uniform(-1e3, 1e3, 100).tolist(),
+                rng.integers(0, 12, 100).tolist())]
+        numbers += rng.uniform(-1e6, 1e6, 100).tolist()
+        array = xltypes.Array([[number] for number in numbers])
+        for func in (math.ROUND, math.ROUNDUP, math.ROUNDDOWN):
+            for num_digits in (-2, 0, 1, 2, 5, 9):
+                for number, result in zip(
+                        numbers, func(array, num_digits).flat):
+                    if abs(number) * 10.0 ** num_digits >= 1e17:
+                        # Out of the scalar functions' decimal precision.
+                        continue
+                    with self.subTest(
+                            func=func.__name__, number=number,
+                            num_digits=num_digits):
+                        self.assertEqual(
+                            result, func(number, num_digits))
+
     def test_SQRT(self):
         self.assertEqual(math.SQRT(4), 2)
         self.assertEqual(math.SQRT(4.0), 2.0)
@@ -86,10 +155,30 @@ class DateModuleTest(unittest.TestCase):
     def test_SQRT_with_bad_arg(self):
         self.assertIsInstance(math.SQRT('bad'), xlerrors.ValueExcelError)
 
+    def test_SQRT_with_array(self):
+        res = math.SQRT(xltypes.Array([
+            [4, -1], ['9', 'bad'], [True, xlerrors.NaExcelError()]
+        ]))
+        self.assertEqual(res.shape, (3, 2))
+        self.assertEqual(res.flat[0], 2)
+        self.assertIsInstance(res.flat[1], xlerrors.NumExcelError)
+        self.assertEqual(res.flat[2], 3)
+        self.assertIsInstance(res.flat[3], xlerrors.ValueExcelError)
+        self.assertEqual(res.flat[4], 1)
+        self.assertIsInstance(res.flat[5], xlerrors.NaExcelError)
+
     def test_SUM(self):
         self.assertEqual(math.SUM(xltypes.Array([[1, 2], [3, 4]])), 10)
         self.assertEqual(math.SUM(1, 2, 3, 4.0), 10.0)
 
+    def test_SUM_keeps_integers(self):
+        self.assertIsInstance(math.SUM(1, 2, 3).value, int)
+        self.assertIsInstance(
+            math.SUM(xltypes.Array([[1, 2], [3, None]])).value, int)
+        self.assertIsInstance(math.SUM(1, 2.5).value, float)
+        self.assertIsInstance(
+            math.SUM(xltypes.Array([[1.5, 2]])).value, float)
+
     def test_SUM_with_nonnumbers_in_range(self):
         self.assertEqual(math.SUM(xltypes.Array([[1, 'bad'], [3, 4]])), 8)
         self.assertEqual(math.SUM(
@@ -98,6 +187,15 @@ class DateModuleTest(unittest.TestCase):
                 [xltypes.Number(3), xltypes.Number(4)]
             ])), 8)
 
+    def test_SUM_with_booleans_and_texts(self):
+        # Booleans and text are only considered when passed directly.
+        self.assertEqual(math.SUM(xltypes.Array([[1, True], ['2', 3]])), 4)
+        self.assertEqual(math.SUM(1, True, '2', 3), 7)
+
+    def test_SUM_with_large_range(self):
+        range1 = xltypes.Array.from_numbers(numpy.arange(100000))
+        self.assertEqual(math.SUM(range1), 4999950000)
+
     def test_SUM_with_bad_Arg(self):
         self.assertEqual(math.SUM('foo'), 0)
 
@@ -107,10 +205,73 @@ class DateModuleTest(unittest.TestCase):
     def test_SUMIF(self):
         self.assertEqual(math.SUMIF([0, 1, 2], '>=1', [10, 20, 30]), 50)
 
-    def test_SUMIF_invalid_criteria(self):
-        self.assertIsInstance(
-            math.SUMIF([0, 1, 2], [0, 1], [10, 20, 30]),
-            xlerrors.ValueExcelError)
+    def test_SUMIF_with_long_range(self):
+        range1 = xltypes.Array.from_numbers(numpy.arange(10000) % 2)
+        sum_range = xltypes.Array.from_numbers(numpy.full(10000, 0.1))
+        self.assertEqual(math.SUMIF(range1, 1, sum_range), 500)
+
+    def test_SUMIF_with_text_criteria(self):
+        self.assertEqual(
+            math.SUMIF(
+                xltypes.Array([['a'], ['A'], ['b'], [None]]), 'a',
+                xltypes.Array([[1], [2], [4], [8]])),
+            3)
+        self.assertEqual(
+            math.SUMIF(
+                xltypes.Array([['a'], ['A'], ['b'], [None]]), '<>a',
+                xltypes.Array([[1], [2], [4], [8]])),
+            12)
+
+    def test_SUMIF_with_error_criteria(self):
+        range1 = xltypes.Array([[1], [2]]).freeze()
+        for _ in range(3):
+            self.assertEqual(math.SUMIF(range1, '#N/A'), 0)
+            self.assertEqual(
+                math.SUMIFS(range1, range1, '#DIV/0!', range1, '>0'), 0)
+
+    def test_SUMIF_with_repeated_range(self):
+        range1 = xltypes.Array([[1], [2], ['a'], [2], [3]]).freeze()
+        sum_range = xltypes.Array([[1], [2], [4], [8], [16]]).freeze()
+        for _ in range(3):
+            self.assertEqual(math.SUMIF(range1, 2, sum_range), 10)
+            self.assertEqual(math.SUMIF(range1, '>1', sum_range), 26)
+            self.assertEqual(math.SUMIF(range1, '<>2', sum_range), 21)
+            self.assertEqual(math.SUMIF(range1, 'A', sum_range), 4)
+
+    def test_SUMIF_with_wildcards(self):
+        self.assertEqual(
+            math.SUMIF(
+                xltypes.Array([['ACME Inc.'], ['Acme'], ['Other']]), 'acme*',
+                xltypes.Array([[1], [2], [4]])),
+            3)
+
+    def test_SUMIF_with_array_criteria(self):
+        result = math.SUMIF([0, 1, 2], [0, 1], [10, 20, 30])
+        self.assertIsInstance(result, xltypes.Array)
+        self.assertEqual(result.values.tolist(), [[10], [20]])
+
+    def test_SUMIF_with_mixed_array_criteria(self):
+        # Wildcards cannot be looked up in an index; each criterion is then
+        # matched separately.
+        self.assertEqual(
+            math.SUMIF(
+                xltypes.Array([['a'], ['b'], ['a'], [3]]),
+                xltypes.Array([['A', '>2', 'a*', 'c']]),
+                xltypes.Array([[1], [2], [4], [8]])).values.tolist(),
+            [[5, 8, 5, 0]])
+
+    def test_SUMIF_with_many_array_criteria(self):
+        keys = numpy.arange(1000) % 37
+        range1 = xltypes.Array.from_numbers(keys.reshape(1000, 1))
+        sum_range = xltypes.Array.from_numbers(
+            numpy.linspace(0, 1, 1000).reshape(1000, 1))
+        criteria = xltypes.Array.from_numbers(
+            numpy.arange(40).reshape(40, 1))
+        result = math.SUMIF(range1, criteria, sum_range)
+        self.assertEqual(result.shape, (40, 1))
+        for key, total in enumerate(result.buffer.numbers):
+            self.assertAlmostEqual(
+                total, sum_range.buffer.numbers[keys == key].sum())
 
     def test_SUMIF_unspecified_sum_range(self):
         self.assertEqual(math.SUMIF([0, 1, 2, 3], ">=2"), 5)
@@ -121,6 +282,26 @@ class DateModuleTest(unittest.TestCase):
         # 0.
         self.assertEqual(math.SUMIF([0, 1, 2, 3], ">=2", 'bad'), 0)
 
+    def test_SUMIFS(self):
+        self.assertEqual(
+            math.SUMIFS(
+                xltypes.Array([[1], [2], [4], [8]]),
+                xltypes.Array([['a'], ['b'], ['a'], ['a']]), 'a',
+                xltypes.Array([[1], [2], [3], [None]]), '>1'),
+            4)
+
+    def test_SUMIFS_with_different_shapes(self):
+        self.assertIsInstance(
+            math.SUMIFS(
+                xltypes.Array([[1], [2]]), xltypes.Array([[1], [2], [3]]), 1),
+            xlerrors.ValueExcelError)
+
+    def test_SUMIFS_with_odd_number_of_arguments(self):
+        self.assertIsInstance(
+            math.SUMIFS(
+                xltypes.Array([[1], [2]]), xltypes.Array([[1], [2]])),
+            xlerrors.ValueExcelError)
+
     def test_SUMPRODUCT(self):
         range1 = xltypes.Array([[1], [10], [3]])
         range2 = xltypes.Array([[3], [1], [2]])
@@ -144,6 +325,11 @@ class DateModuleTest(unittest.TestCase):
         self.assertIsInstance(
             math.SUMPRODUCT(range1, range2), xlerrors.NaExcelError)
 
+    def test_SUMPRODUCT_with_non_numeric_values(self):
+        range1 = xltypes.Array([[1], ['a'], [True], [3]])
+        range2 = xltypes.Array([[3], [1], [2], [None]])
+        self.assertEqual(math.SUMPRODUCT(range1, range2), 3)
+
     def test_SUMPRODUCT_with_single_value(self):
         self.assertEqual(math.SUMPRODUCT(1), 1.0)
 
@@ -157,3 +343,9 @@ class DateModuleTest(unittest.TestCase):
             math.TRUNC('bad'), xlerrors.ValueExcelError)
         self.assertIsInstance(
             math.TRUNC(1.3, 'bad'), xlerrors.ValueExcelError)
+
+    def test_TRUNC_with_array(self):
+        res = math.TRUNC(xltypes.Array([[1.29, -1.29]]), 1)
+        self.assertEqual(res.flat, [1.2, -1.2])
+        res = math.TRUNC(xltypes.Array([[1.29, -1.29]]))
+        self.assertEqual(res.flat, [1, -1])
@@ -1,6 +1,7 @@
+import datetime
 import unittest
 
-from xlfunctions import xlerrors, operator
+from xlfunctions import xlerrors, xltypes, operator
 
 
 class OperatorModuleTest(unittest.TestCase):
@@ -51,6 +52,13 @@ class OperatorModuleTest(unittest.TestCase):
         self.assertEqual(operator.OP_LT(None, 2), False)
         self.assertEqual(operator.OP_LT(2, None), False)
 
+    def test_OP_LT_with_None_in_array(self):
+        # Unlike a blank operand, blank cells compare like 0.
+        self.assertEqual(
+            operator.OP_LT(xltypes.Array([[None]]), 2).flat, [True])
+        self.assertEqual(
+            operator.OP_LT(2, xltypes.Array([[None]])).flat, [False])
+
     def test_OP_GE(self):
         self.assertEqual(operator.OP_GE(2, 1), True)
         self.assertEqual(operator.OP_GE(1, 1), True)
@@ -75,3 +83,115 @@ class OperatorModuleTest(unittest.TestCase):
 
     def test_OP_PERCENT(self):
         self.assertEqual(operator.OP_PERCENT(2), 0.02)
+
+    def test_OP_MUL_with_arrays(self):
+        res = operator.OP_MUL(
+            xltypes.Array([[1, 2], [3, 4]]), xltypes.Array([[10, 100]]))
+        self.assertEqual(res.values.tolist(), [[10, 200], [30, 400]])
+
+    def test_OP_DIV_with_arrays(self):
+        res = operator.OP_DIV(
+            xltypes.Array([[1, 2, 3]]), xltypes.Array([[2, 0, 'bad']]))
+        self.assertEqual(res.flat[0], 0.5)
+        self.assertIsInstance(res.flat[1], xlerrors.DivZeroExcelError)
+        self.assertIsInstance(res.flat[2], xlerrors.ValueExcelError)
+
+    def test_OP_ADD_with_arrays(self):
+        res = operator.OP_ADD(xltypes.Array([[1, True, None, '2']]), 1)
+        self.assertEqual(res.flat, [2, 2, 1, 3])
+
+    def test_OP_ADD_with_arrays_of_different_size(self):
+        res = operator.OP_ADD(
+            xltypes.Array([[1, 2, 3]]), xltypes.Array([[1, 2]]))
+        self.assertEqual(res.flat[:2], [2, 4])
+        self.assertIsInstance(res.flat[2], xlerrors.NaExcelError)
+
+    def test_OP_SUB_with_arrays(self):
+        res = operator.OP_SUB(
+            xltypes.Array([[1], [2]]),
+            xltypes.Array([[1], [xlerrors.NumExcelError()]]))
+        self.assertEqual(res.flat[0], 0)
+        self.assertIsInstance(res.flat[1], xlerrors.NumExcelError)
+
+    def test_OP_NEG_with_array(self):
+        self.assertEqual(
+            operator.OP_NEG(xltypes.Array([[1, -2]])).flat, [-1, 2])
+
+    def test_OP_PERCENT_with_array(self):
+        self.assertEqual(
+            operator.OP_PERCENT(xltypes.Array([[50, 200]])).flat, [0.5, 2])
+
+    def test_OP_EQ_with_arrays(self):
+        res = operator.OP_EQ(
+            xltypes.Array([['a', 'A', 'b', 1, True, None]]), 'a')
+        self.assertEqual(res.flat, [True, True, False, False, False, False])
+        res = operator.OP_EQ(
+            xltypes.Array([[None, None, None, None]]),
+            xltypes.Array([[0, '', False, None]]))
+        self.assertEqual(res.flat, [True, True, True, True])
+
+    def test_OP_NE_with_arrays(self):
+        res = operator.OP_NE(xltypes.Array([[1, 2]]), xltypes.Array([[1]]))
+        self.assertEqual(res.flat, [False, True])
+
+    def test_OP_GT_with_arrays(self):
+        # Excel sorts numbers before text before booleans.
+        res = operator.OP_GT(
+            xltypes.Array([[1, 'a', True, -1, None, 'B']]), 0)
+        self.assertEqual(res.flat, [True, True, True, False, False, True])
+        res = operator.OP_GT(
+            xltypes.Array([['b', 'B', 'a', True]]),
+            xltypes.Array([['A', 'a', 'B', False]]))
+        self.assertEqual(res.flat, [True, True, False, True])
+
+    def test_OP_LT_with_arrays(self):
+        res = operator.OP_LT(
+            -1, xltypes.Array([[None, xlerrors.NumExcelError(), 'a']]))
+        self.assertEqual(res.flat[0], True)
+        self.assertIsInstance(res.flat[1], xlerrors.NumExcelError)
+        self.assertEqual(res.flat[2], True)
+
+    def test_OP_GE_with_arrays(self):
+        res = operator.OP_GE(xltypes.Array([[1, 2], [3, 4]]), 2)
+        self.assertEqual(res.values.tolist(), [[False, True], [True, True]])
+
+    def test_OP_LE_with_arrays(self):
+        res = operator.OP_LE(
+            xltypes.Array([[1], [2]]), xltypes.Array([[1, 2, 3]]))
+        self.assertEqual(
+            res.values.tolist(), [[True, True, True], [False, True, True]])
+
+    def test_comparison_and_arithmetic_with_arrays(self):
+        res = operator.OP_MUL(
+            operator.OP_GT(xltypes.Array([[1], [-1], [2]]), 0),
+            xltypes.Array([[5], [6], [7]]))
+        self.assertEqual(res.flat, [5, 0, 7])
+
+    def test_specialized_arithmetic(self):
+        res = operator.OP_ADD(1, 2)
+        self.assertIsInstance(res, xltypes.Number)
+        self.assertEqual(res.value, 3)
+        self.assertEqual(operator.OP_SUB(xltypes.Number(1), None), 1.0)
+        self.assertEqual(operator.OP_MUL('2', 3.0), 6.0)
+        self.assertIsInstance(
+            operator.OP_MUL('bad', 3.0), xlerrors.ValueExcelError)
+        self.assertEqual(
+            operator.OP_SUB(datetime.datetime(1900, 1, 3), 1), 2)
+        self.assertIsInstance(
+            operator.OP_DIV(1, xltypes.BLANK), xlerrors.DivZeroExcelError)
+
+    def test_specialized_comparison(self):
+        self.assertIs(operator.OP_GT(2, 1.5), xltypes.TRUE)
+        self.assertIs(operator.OP_LE(2, xltypes.Number(1)), xltypes.FALSE)
+        self.assertIs(operator.OP_GE('a', 1000), xltypes.TRUE)
+        self.assertIs(operator.OP_LT('a', 1000), xltypes.FALSE)
+        self.assertIs(operator.OP_LT(xltypes.BLANK, 1), xltypes.FALSE)
+        self.assertIs(
+            operator.OP_GT(datetime.datetime(1900, 1, 3), 2), xltypes.TRUE)
+
+    def test_unspecialized_operands(self):
+        self.assertEqual(operator.OP_ADD(True, 'TRUE'), 2)
+        self.assertIs(operator.OP_GT('b', 'a'), xltypes.TRUE)
+        self.assertIsInstance(
+            operator.OP_ADD(xlerrors.NumExcelError(), 1),
+            xlerrors.NumExcelError)
@@ -1,3 +1,4 @@
+import datetime
 import unittest
 
 from xlfunctions import xlerrors, xltypes, statistics
@@ -15,12 +16,30 @@ class StatisticsModuleTest(unittest.TestCase):
     def test_AVERAGE_without_any_numbers(self):
         self.assertEqual(statistics.AVERAGE(), 0)
 
+    def test_AVERAGE_with_booleans_and_texts(self):
+        self.assertEqual(
+            statistics.AVERAGE(xltypes.Array([[1, True], ['a', None]])), 1)
+        self.assertEqual(statistics.AVERAGE(1, True, '4'), 2)
+
     def test_AVERAGE_mixed(self):
         self.assertEqual(
             statistics.AVERAGE(xltypes.Array([[1, 2], [3, 4]]), 1, 2, 3, 4),
             2.5
         )
 
+    def test_AVERAGEIFS(self):
+        self.assertEqual(
+            statistics.AVERAGEIFS(
+                xltypes.Array([[1], [2], [3], ['text']]),
+                xltypes.Array([['a'], ['b'], ['a'], ['a']]), 'a'),
+            2)
+
+    def test_AVERAGEIFS_without_matches(self):
+        self.assertIsInstance(
+            statistics.AVERAGEIFS(
+                xltypes.Array([[1], [2]]), xltypes.Array([[1], [2]]), '>5'),
+            xlerrors.DivZeroExcelError)
+
     def test_COUNT(self):
         range0 = xltypes.Array([[1, 2], [3, 4]])
         range1 = xltypes.Array([[1, 2], [3, 'SPAM']])
@@ -30,6 +49,16 @@ class StatisticsModuleTest(unittest.TestCase):
         self.assertEqual(statistics.COUNT(range0, range1, 1), 8)
         self.assertEqual(statistics.COUNT(range0, range1, 1, 'SPAM'), 8)
 
+    def test_COUNT_with_dates_and_booleans(self):
+        range0 = xltypes.Array([
+            [datetime.datetime(2020, 1, 1), True], ['1', None]])
+        self.assertEqual(statistics.COUNT(range0), 1)
+        self.assertEqual(statistics.COUNT(range0, True, '1'), 3)
+
+    def test_COUNT_with_large_range(self):
+        range0 = xltypes.Array([[1]] * 300)
+        self.assertEqual(statistics.COUNT(range0), 300)
+
     def test_COUNT_without_any_values(self):
         self.assertIsInstance(
             statistics.COUNT(), xlerrors.ValueExcelError)
@@ -44,6 +73,13 @@ class StatisticsModuleTest(unittest.TestCase):
         self.assertEqual(statistics.COUNTA(range0), 4)
         self.assertEqual(statistics.COUNTA(range1), 3)
 
+    def test_COUNTA_with_direct_values(self):
+        self.assertEqual(statistics.COUNTA(1, 'a', '', True), 3)
+
+    def test_COUNTA_with_errors(self):
+        range0 = xltypes.Array([[xlerrors.NaExcelError(), None]])
+        self.assertEqual(statistics.COUNTA(range0), 1)
+
     def test_COUNTA_with_bad_arg(self):
         self.assertIsInstance(statistics.COUNTA(None), xlerrors.NullExcelError)
 
@@ -54,12 +90,83 @@ class StatisticsModuleTest(unittest.TestCase):
         self.assertIsInstance(
             statistics.COUNTA([0]*300), xlerrors.ValueExcelError)
 
+    def test_COUNTIF(self):
+        range1 = xltypes.Array([['a'], ['A'], [1], ['1'], [None], [3]])
+        self.assertEqual(statistics.COUNTIF(range1, 'a'), 2)
+        self.assertEqual(statistics.COUNTIF(range1, 1), 1)
+        self.assertEqual(statistics.COUNTIF(range1, '>=1'), 2)
+        self.assertEqual(statistics.COUNTIF(range1, '<>a'), 4)
+        self.assertEqual(statistics.COUNTIF(range1, '?'), 3)
+
+    def test_COUNTIF_with_error_criteria(self):
+        range1 = xltypes.Array([[1], [2]])
+        self.assertEqual(statistics.COUNTIF(range1, '#N/A'), 0)
+        self.assertEqual(statistics.COUNTIF(range1, '<>#N/A'), 2)
+
+    def test_COUNTIF_with_repeated_range(self):
+        range1 = xltypes.Array([['a'], ['A'], [1], ['b'], [1]]).freeze()
+        for _ in range(3):
+            self.assertEqual(statistics.COUNTIF(range1, 'a'), 2)
+            self.assertEqual(statistics.COUNTIF(range1, 1), 2)
+            self.assertEqual(statistics.COUNTIF(range1, '<2'), 2)
+            self.assertEqual(statistics.COUNTIF(range1, 'a*'), 2)
+
+    def test_COUNTIF_with_array_criteria(self):
+        range1 = xltypes.Array([['a'], ['A'], [1], ['b'], [1]])
+        result = statistics.COUNTIF(range1, range1)
+        self.assertIsInstance(result, xltypes.Array)
+        self.assertEqual(result.values.tolist(), [[2], [2], [2], [1], [2]])
+
+    def test_COUNTIFS(self):
+        self.assertEqual(
+            statistics.COUNTIFS(
+                xltypes.Array([['a'], ['b'], ['A'], ['a']]), 'a',
+                xltypes.Array([[1], [2], [3], [None]]), '>=1'),
+            2)
+
+    def test_COUNTIFS_with_different_shapes(self):
+        self.assertIsInstance(
+            statistics.COUNTIFS(
+                xltypes.Array([[1], [2]]), 1, xltypes.Array([[1, 2]]), 1),
+            xlerrors.ValueExcelError)
+
+    def test_COUNTIFS_without_criteria(self):
+        self.assertIsInstance(
+            statistics.COUNTIFS(xltypes.Array([[1], [2]])),
+            xlerrors.ValueExcelError)
+
     def test_MAX(self):
         self.assertEqual(statistics.MAX(xltypes.Array([[1, 2], [3, 4]])), 4)
 
+    def test_MAX_with_mixed_types(self):
+        self.assertEqual(
+            statistics.MAX(xltypes.Array([[1, True], ['5', None]])), 1)
+        self.assertEqual(statistics.MAX(xltypes.Array([['a']])), 0)
+        self.assertEqual(statistics.MAX(1, True, '5'), 5)
+
+    def test_MAX_keeps_integers(self):
+        self.assertIsInstance(statistics.MAX(1, 2), int)
+        self.assertIsInstance(
+            statistics.MAX(xltypes.Array([[1.5, 2]])), int)
+        self.assertIsInstance(statistics.MAX(1, 2.5), float)
+        self.assertIsInstance(statistics.MIN(2, 3.0, True), int)
+
     def test_MAX_without_any_numbers(self):
         self.assertEqual(statistics.MAX(), 0)
 
+    def test_MAXIFS(self):
+        self.assertEqual(
+            statistics.MAXIFS(
+                xltypes.Array([[1], [5], [3]]),
+                xltypes.Array([['a'], ['b'], ['a']]), 'a'),
+            3)
+
+    def test_MAXIFS_without_matches(self):
+        self.assertEqual(
+            statistics.MAXIFS(
+                xltypes.Array([[1], [5]]), xltypes.Array([[1], [2]]), 3),
+            0)
+
     def test_MIN(self):
         self.assertEqual(statistics.MIN(xltypes.Array([[1, 2], [3, 4]])), 1)
 
@@ -68,3 +175,17 @@ class StatisticsModuleTest(unittest.TestCase):
 
     def test_MIN_with_mixed_types(self):
         self.assertEqual(statistics.MIN(2, 3.0, True), 1)
+
+    def test_MINIFS(self):
+        self.assertEqual(
+            statistics.MINIFS(
+                xltypes.Array([[1], [5], [3]]),
+                xltypes.Array([['a'], ['b'], ['a']]), '<>a'),
+            5)
+
+    def test_MINIFS_with_error(self):
+        self.assertIsInstance(
+            statistics.MINIFS(
+                xltypes.Array([[1], [xlerrors.NumExcelError()]]),
+                xltypes.Array([[1], [2]]), '>0'),
+            xlerrors.NumExcelError)
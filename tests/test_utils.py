@@ -0,0 +1,38 @@
+import datetime
+import mock
+import numpy
+import unittest
+
+from xlfunctions import utils
+
+
+class UtilsModuleTest(unittest.TestCase):
+
+    def test_number_to_datetime(self):
+        self.assertEqual(
+            utils.number_to_datetime(43831), datetime.datetime(2020, 1, 1))
+
+    def test_datetime_to_number(self):
+        self.assertEqual(
+            utils.datetime_to_number(datetime.datetime(2020, 1, 1)), 43831)
+
+    def test_sum_numbers(self):
+        self.assertEqual(utils.sum_numbers([]), 0)
+        self.assertEqual(utils.sum_numbers([1, 2, 3]), 6)
+        self.assertEqual(utils.sum_numbers([0.1] * 10), 1.0)
+        self.assertEqual(utils.sum_numbers([1e100, 1.0, -1e100]), 1.0)
+
+    def test_sum_numbers_with_many_values(self):
+        values = numpy.full(100001, 0.1)
+        values[0] = 1e10
+        self.assertEqual(utils.sum_numbers(values), 1e10 + 10000)
+        self.assertEqual(
+            utils.sum_numbers(values.reshape(1, -1)), 1e10 + 10000)
+
+    def test_sum_numbers_not_compensated(self):
+        self.assertEqual(
+            utils.sum_numbers([1e100, 1.0, -1e100], compensated=False), 0)
+
+    @mock.patch.object(utils, 'COMPENSATED_SUMMATION', False)
+    def test_sum_numbers_with_compensation_disabled(self):
+        self.assertEqual(utils.sum_numbers([1e100, 1.0, -1e100]), 0)
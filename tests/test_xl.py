@@ -1,4 +1,5 @@
 import mock
+import numpy
 import typing
 import unittest
 
@@ -39,6 +40,32 @@ class FunctionsTest(unittest.TestCase):
         with self.assertRaises(AttributeError):
             fn.sample
 
+    def test_register_withMetadata(self):
+
+        def sample():
+            pass
+
+        fn = xl.Functions()
+        fn.register(sample, volatile=True, cost=xl.COST_EXPENSIVE)
+        self.assertTrue(fn.info['sample'].volatile)
+        self.assertEqual(fn.info['sample'].cost, xl.COST_EXPENSIVE)
+
+    def test_select(self):
+
+        def sample1():
+            pass
+
+        def sample2():
+            pass
+
+        fn = xl.Functions()
+        fn.register(sample1, vectorized=True)
+        fn.register(sample2)
+        self.assertEqual(fn.select(vectorized=True), ['sample1'])
+        self.assertEqual(
+            fn.select(vectorized=False, cost=xl.COST_CHEAP), ['sample2'])
+        self.assertEqual(fn.select(), ['sample1', 'sample2'])
+
     def test_register_decorator(self):
 
         with mock.patch('xlfunctions.xl.FUNCTIONS', xl.Functions()):
@@ -49,6 +76,224 @@ class FunctionsTest(unittest.TestCase):
 
             self.assertDictEqual(dict(xl.FUNCTIONS), {'sample': sample})
 
+    def test_register_decorator_withMetadata(self):
+
+        with mock.patch('xlfunctions.xl.FUNCTIONS', xl.Functions()):
+
+            @xl.register(vectorized=True)
+            def sample():
+                pass
+
+            self.assertTrue(xl.FUNCTIONS.info['sample'].vectorized)
+
+
+class FunctionInfoTest(unittest.TestCase):
+
+    def test_defaults(self):
+
+        def sample(arg: xltypes.XlNumber):
+            pass
+
+        info = xl.FunctionInfo('sample', sample)
+        self.assertFalse(info.volatile)
+        self.assertTrue(info.pure)
+        self.assertEqual(info.lazy, ())
+        self.assertFalse(info.array_aware)
+        self.assertFalse(info.vectorized)
+        self.assertEqual(info.cost, xl.COST_CHEAP)
+
+    def test_derived_from_annotations(self):
+
+        def sample(
+                arg1: xltypes.XlExpr,
+                arg2: xltypes.XlArray,
+                *args: typing.Tuple[xltypes.XlExpr]
+        ):
+            pass
+
+        info = xl.FunctionInfo('sample', xl.validate_args(sample))
+        self.assertEqual(info.lazy, ('arg1', 'args'))
+        self.assertTrue(info.array_aware)
+        self.assertEqual(info.cost, xl.COST_LINEAR)
+
+    def test_anything_is_not_array_aware(self):
+
+        def sample(arg: xltypes.XlAnything):
+            pass
+
+        self.assertFalse(xl.FunctionInfo('sample', sample).array_aware)
+
+    def test_elementwise_is_vectorized(self):
+
+        @xl.elementwise(lambda number: (number, ()))
+        def sample(number: xltypes.XlNumber):
+            pass
+
+        info = xl.FunctionInfo('sample', xl.validate_args(sample))
+        self.assertTrue(info.vectorized)
+        self.assertTrue(info.array_aware)
+
+    def test_explicit(self):
+
+        def sample(*args):
+            pass
+
+        info = xl.FunctionInfo(
+            'sample', sample, volatile=True, lazy=['args'], array_aware=True,
+            vectorized=True, cost=xl.COST_EXPENSIVE)
+        self.assertTrue(info.volatile)
+        self.assertFalse(info.pure)
+        self.assertEqual(info.lazy, ('args',))
+        self.assertTrue(info.array_aware)
+        self.assertTrue(info.vectorized)
+        self.assertEqual(info.cost, xl.COST_EXPENSIVE)
+
+    def test_repr(self):
+
+        def sample():
+            pass
+
+        self.assertEqual(
+            repr(xl.FunctionInfo('sample', sample)),
+            '<FunctionInfo sample volatile=False lazy=() array_aware=False '
+            'vectorized=False cost=cheap>'
+        )
+
+    def test_registered_functions(self):
+        import xlfunctions  # noqa: F401 -- registers all functions
+        info = xl.FUNCTIONS.info
+        self.assertTrue(info['TODAY'].volatile)
+        self.assertEqual(
+            info['IF'].lazy,
+            ('logical_test', 'value_if_true', 'value_if_false'))
+        self.assertTrue(info['SUM'].vectorized)
+        self.assertIn('TODAY', xl.FUNCTIONS.select(volatile=True))
+        self.assertNotIn('SUM', xl.FUNCTIONS.select(volatile=True))
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_get(self):
+        cache = xl.LRUCache(maxsize=2)
+        self.assertEqual(cache.get('a', lambda: 1), 1)
+        self.assertEqual(cache.get('a', lambda: 2), 1)
+        cache.get('b', lambda: 3)
+        cache.get('a', lambda: 4)
+        cache.get('c', lambda: 5)
+        # 'b' was the least recently used entry.
+        self.assertEqual(cache.get('b', lambda: 6), 6)
+        self.assertEqual(
+            cache.stats,
+            {'hits': 2, 'misses': 4, 'evictions': 2, 'size': 2, 'maxsize': 2})
+
+    def test_disabled(self):
+        cache = xl.LRUCache()
+        self.assertEqual(cache.get('a', lambda: 1), 1)
+        self.assertEqual(cache.get('a', lambda: 2), 2)
+        self.assertEqual(len(cache), 0)
+
+
+class FunctionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = xl.FunctionCache(maxsize=2)
+        patcher = mock.patch('xlfunctions.xl.FUNCTION_CACHE', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = []
+
+    def register(self, **kw):
+
+        def sample(*args):
+            self.calls.append(args)
+            return len(self.calls)
+
+        with mock.patch('xlfunctions.xl.FUNCTIONS', xl.Functions()):
+            return xl.register(**kw)(sample)
+
+    def test_hit(self):
+        func = self.register()
+        self.assertEqual(func(1, 'a'), 1)
+        self.assertEqual(func(xltypes.Number(1), xltypes.Text('a')), 1)
+        self.assertEqual(func(1.0, 'a'), 2)
+        self.assertEqual(
+            self.cache.stats,
+            {'hits': 1, 'misses': 2, 'evictions': 0, 'size': 2, 'maxsize': 2})
+
+    def test_lru_eviction(self):
+        func = self.register()
+        func(1)
+        func(2)
+        func(1)
+        func(3)
+        self.assertEqual(self.cache.evictions, 1)
+        # 2 was the least recently used entry.
+        func(1)
+        func(2)
+        self.assertEqual(self.calls, [(1,), (2,), (3,), (2,)])
+
+    def test_volatile(self):
+        func = self.register(volatile=True)
+        func(1)
+        func(1)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_disabled(self):
+        self.cache.resize(0)
+        func = self.register()
+        func(1)
+        func(1)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.cache.misses, 0)
+
+    def test_clear(self):
+        func = self.register()
+        func(1)
+        func(1)
+        self.cache.clear()
+        self.assertEqual(
+            self.cache.stats,
+            {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0, 'maxsize': 2})
+        func(1)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_resize(self):
+        func = self.register()
+        func(1)
+        func(2)
+        self.cache.resize(1)
+        self.assertEqual(self.cache.evictions, 1)
+        func(2)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_frozen_array(self):
+        func = self.register()
+        func(xltypes.Array([[1, 2]]).freeze())
+        func(xltypes.Array([[1, 2]]).freeze())
+        func(xltypes.Array([[1, 3]]).freeze())
+        self.assertEqual(len(self.calls), 2)
+
+    def test_uncacheable(self):
+        func = self.register()
+        value = xltypes.Expr(lambda: 1)
+        func(value)
+        func(value)
+        func([{}])
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_keywords(self):
+
+        def sample(a, b=0):
+            self.calls.append((a, b))
+
+        func = xl._memoized(sample)
+        func(1, b=2)
+        func(1, b=2)
+        func(1, b=3)
+        self.assertEqual(self.calls, [(1, 2), (1, 3)])
+
 
 class XlModuleTest(unittest.TestCase):
 
@@ -114,3 +359,126 @@ class XlModuleTest(unittest.TestCase):
 
         obj = object()
         self.assertEqual(func(obj), obj)
+
+    def test_validate_args_with_keyword(self):
+
+        @xl.validate_args
+        def func(arg1: xltypes.XlNumber, arg2: xltypes.XlNumber = 0):
+            return arg1 + arg2
+
+        self.assertEqual(func('1', arg2='2'), 3)
+        self.assertIsInstance(
+            func(1, arg2=xlerrors.NumExcelError()), xlerrors.NumExcelError)
+
+    def test_validate_args_with_default(self):
+
+        @xl.validate_args
+        def func(arg1: xltypes.XlNumber, arg2: xltypes.XlNumber = None):
+            return arg2
+
+        # Defaults are not cast.
+        self.assertIsNone(func(1))
+
+    def test_validate_args_with_varargs(self):
+
+        @xl.validate_args
+        def func(arg1: xltypes.XlNumber, *args: typing.List[xltypes.XlNumber]):
+            return (arg1,) + args
+
+        self.assertEqual(func('1', '2', 'bad', 3), (1, 2, 3))
+        self.assertEqual(func('1'), (1,))
+
+    def test_validate_args_with_elementwise(self):
+
+        def kernel(number1, number2):
+            return (
+                number1 / number2,
+                [(number2 == 0, xlerrors.DivZeroExcelError)]
+            )
+
+        @xl.validate_args
+        @xl.elementwise(kernel)
+        def func(
+                number1: xltypes.XlNumber,
+                number2: xltypes.XlNumber = 1,
+                text: xltypes.XlText = 'a'
+        ) -> xltypes.XlNumber:
+            return number1 / number2
+
+        self.assertEqual(func(6, 3), 2)
+        res = func(xltypes.Array([[6, 4]]), xltypes.Array([[2], [0]]))
+        self.assertIsInstance(res, xltypes.Array)
+        self.assertEqual(res.flat[:2], [3, 2])
+        self.assertIsInstance(res.flat[2], xlerrors.DivZeroExcelError)
+        self.assertIsInstance(res.flat[3], xlerrors.DivZeroExcelError)
+        # Defaults and keywords
+        self.assertEqual(func(xltypes.Array([[6, 4]])).flat, [6, 4])
+        self.assertEqual(
+            func(number2=2, number1=xltypes.Array([[6, 4]])).flat, [3, 2])
+        # Errors of scalar arguments are returned as is.
+        self.assertIsInstance(
+            func(xltypes.Array([[6, 4]]), xlerrors.NumExcelError()),
+            xlerrors.NumExcelError)
+
+    def test_validate_args_with_elementwise_broadcasting(self):
+
+        @xl.validate_args
+        @xl.elementwise(lambda number1, number2: (number1 + number2, ()))
+        def func(number1: xltypes.XlNumber, number2: xltypes.XlNumber):
+            pass
+
+        res = func(xltypes.Array([[1, 2, 3]]), xltypes.Array([[1, 1]]))
+        self.assertEqual(res.shape, (1, 3))
+        self.assertEqual(res.flat[:2], [2, 3])
+        # Cells outside of an argument are #N/A.
+        self.assertIsInstance(res.flat[2], xlerrors.NaExcelError)
+        # The error of the first argument wins.
+        res = func(
+            xltypes.Array([[xlerrors.NullExcelError(), 'bad']]),
+            xltypes.Array([[xlerrors.NumExcelError(), 1]]))
+        self.assertIsInstance(res.flat[0], xlerrors.NullExcelError)
+        self.assertIsInstance(res.flat[1], xlerrors.ValueExcelError)
+        # Non-finite results are #NUM!
+        res = func(xltypes.Array([[1e308]]), 1e308)
+        self.assertIsInstance(res.flat[0], xlerrors.NumExcelError)
+        # Empty arrays
+        res = func(xltypes.Array([[1, 2]]), xltypes.Array([]))
+        self.assertIsInstance(res.flat[0], xlerrors.NaExcelError)
+
+    def test_broadcast_shape(self):
+        self.assertEqual(
+            xl.broadcast_shape(
+                [xltypes.Array([[1, 2, 3]]), 1, xltypes.Array([[1], [2]])]),
+            (2, 3))
+
+    def test_broadcast_index(self):
+        values = numpy.array([[1, 2]])
+        index, outside = xl.broadcast_index(values.shape, (2, 3))
+        self.assertEqual(values[index].tolist(), [[1, 2, 2], [1, 2, 2]])
+        self.assertEqual(
+            outside.tolist(), [[False, False, True], [False, False, True]])
+
+    def test_result_array(self):
+        res = xl.result_array(
+            numpy.array([[1.0, 0.0]]), numpy.array([[-1, 1]]),
+            xltypes.TAG_BOOLEAN)
+        self.assertEqual(res.flat[0], True)
+        self.assertIsInstance(res.flat[1], xlerrors.DivZeroExcelError)
+
+    def test_validate_args_with_too_many_args(self):
+
+        @xl.validate_args
+        def func(arg: xltypes.XlNumber):
+            return arg
+
+        with self.assertRaises(TypeError):
+            func(1, 2)
+
+    def test_masked_numbers(self):
+        array = xltypes.Array([[1, 'a', True, xlerrors.NaExcelError()]])
+        self.assertEqual(
+            xl.masked_numbers(
+                array, numpy.array([True, True, True, False])).tolist(),
+            [1])
+        with self.assertRaises(xlerrors.NaExcelError):
+            xl.masked_numbers(array, numpy.array([True, True, True, True]))
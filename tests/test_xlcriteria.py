@@ -1,6 +1,9 @@
+import datetime
+import mock
+import numpy
 import unittest
 
-from xlfunctions import xlcriteria
+from xlfunctions import xlcriteria, xlerrors, xltypes
 
 
 class XlCriteriaModuleTest(unittest.TestCase):
@@ -31,3 +34,243 @@ class XlCriteriaModuleTest(unittest.TestCase):
         check = xlcriteria.parse_criteria(1)
         self.assertTrue(check(1))
         self.assertFalse(check(2))
+
+    def test_parse_criteria_is_cached(self):
+        self.assertIs(
+            xlcriteria.parse_criteria('>3'), xlcriteria.parse_criteria('>3'))
+        self.assertIs(
+            xlcriteria.parse_criteria(xltypes.Text('>3')),
+            xlcriteria.parse_criteria('>3'))
+        self.assertIsNot(
+            xlcriteria.parse_criteria(1), xlcriteria.parse_criteria(True))
+
+    def test_parse_criteria_with_array(self):
+        with self.assertRaises(xlerrors.ValueExcelError):
+            xlcriteria.parse_criteria([[1, 2]])
+
+    def test_parse_criteria_with_negative_number(self):
+        check = xlcriteria.parse_criteria('>-5')
+        self.assertTrue(check(-4))
+        self.assertFalse(check(-6))
+
+    def test_parse_criteria_with_date(self):
+        check = xlcriteria.parse_criteria('>=2020-01-01')
+        self.assertTrue(check(datetime.datetime(2020, 1, 1)))
+        self.assertFalse(check(datetime.datetime(2019, 12, 31)))
+        check = xlcriteria.parse_criteria(datetime.datetime(2020, 1, 1))
+        self.assertTrue(check(datetime.datetime(2020, 1, 1)))
+
+    def test_parse_criteria_with_blank_criteria(self):
+        # Like 0
+        check = xlcriteria.parse_criteria(None)
+        self.assertTrue(check(0))
+        self.assertFalse(check(None))
+
+    def test_mask_numbers(self):
+        array = xltypes.Array([[1, 5, '5', True, None, 'abc']])
+        self.assertEqual(
+            xlcriteria.parse_criteria('>3').mask(array).tolist(),
+            [False, True, False, False, False, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria(5).mask(array).tolist(),
+            [False, True, False, False, False, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria('<>5').mask(array).tolist(),
+            [True, False, True, True, True, True])
+
+    def test_mask_texts(self):
+        array = xltypes.Array([['abc', 'ABC', 'b', 1, None, '']])
+        self.assertEqual(
+            xlcriteria.parse_criteria('abc').mask(array).tolist(),
+            [True, True, False, False, False, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria('>=B').mask(array).tolist(),
+            [False, False, True, False, False, False])
+
+    def test_mask_blanks(self):
+        array = xltypes.Array([['abc', None, '', 0]])
+        self.assertEqual(
+            xlcriteria.parse_criteria('').mask(array).tolist(),
+            [False, True, True, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria('=').mask(array).tolist(),
+            [False, True, False, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria('<>').mask(array).tolist(),
+            [True, False, True, True])
+
+    def test_mask_booleans(self):
+        array = xltypes.Array([[True, False, 1, 'TRUE']])
+        self.assertEqual(
+            xlcriteria.parse_criteria('TRUE').mask(array).tolist(),
+            [True, False, False, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria(False).mask(array).tolist(),
+            [False, True, False, False])
+
+    def test_mask_errors(self):
+        array = xltypes.Array([
+            [xlerrors.NaExcelError(), xlerrors.NumExcelError(), 1]])
+        self.assertEqual(
+            xlcriteria.parse_criteria('#N/A').mask(array).tolist(),
+            [True, False, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria('>0').mask(array).tolist(),
+            [False, False, True])
+
+    def test_mask_errors_without_error_cells(self):
+        array = xltypes.Array([[1], ['a'], [None]])
+        self.assertEqual(
+            xlcriteria.parse_criteria('#N/A').mask(array).tolist(),
+            [False, False, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria('<>#N/A').mask(array).tolist(),
+            [True, True, True])
+        self.assertFalse(xlcriteria.parse_criteria('#N/A')(5))
+
+    def test_mask_wildcards(self):
+        array = xltypes.Array([['ACME Inc.', 'acme', 'Acne', 'x acme', None]])
+        self.assertEqual(
+            xlcriteria.parse_criteria('acme*').mask(array).tolist(),
+            [True, True, False, False, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria('ac?e').mask(array).tolist(),
+            [False, True, True, False, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria('<>*acme').mask(array).tolist(),
+            [True, False, True, False, True])
+
+    def test_mask_wildcards_with_escapes(self):
+        array = xltypes.Array([['a*', 'ab', 'a?', 'a~']])
+        self.assertEqual(
+            xlcriteria.parse_criteria('a~*').mask(array).tolist(),
+            [True, False, False, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria('a~?').mask(array).tolist(),
+            [False, False, True, False])
+        self.assertEqual(
+            xlcriteria.parse_criteria('a~~').mask(array).tolist(),
+            [False, False, False, True])
+
+    def test_wildcards_are_compiled_once(self):
+        criterion = xlcriteria.parse_criteria('x*y?')
+        self.assertEqual(criterion.pattern.pattern, 'x.*y.')
+        self.assertIs(xlcriteria.parse_criteria('x*y?'), criterion)
+        self.assertTrue(criterion('XaaYb'))
+        self.assertFalse(criterion('XaaY'))
+
+    def test_wildcards_only_apply_to_equality(self):
+        self.assertIsNone(xlcriteria.parse_criteria('>a*').pattern)
+
+    def test_criteria_mask(self):
+        mask = xlcriteria.criteria_mask((
+            xltypes.Array([[1, 2], [3, 4]]), '>1',
+            xltypes.Array([['a', 'b'], ['a', 'a']]), 'a',
+        ))
+        self.assertEqual(mask.tolist(), [False, False, True, True])
+
+    def test_criteria_mask_with_shape(self):
+        with self.assertRaises(xlerrors.ValueExcelError):
+            xlcriteria.criteria_mask(
+                (xltypes.Array([[1, 2]]), '>1'), shape=(2, 1))
+
+    def test_criteria_mask_with_error(self):
+        with self.assertRaises(xlerrors.NaExcelError):
+            xlcriteria.criteria_mask(
+                (xltypes.Array([[1, 2]]), xlerrors.NaExcelError()))
+
+    def test_repr(self):
+        self.assertEqual(
+            repr(xlcriteria.parse_criteria('>3')), '<Criterion ><Number 3>>')
+
+
+class CriteriaIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.range = xltypes.Array([
+            [1], [2], [2.5], [-1], [0], ['a'], ['A'], [''], [None], [True],
+            [False], [xlerrors.NaExcelError()], ['3'], [2]
+        ]).freeze()
+        self.sum_range = xltypes.Array.from_numbers(
+            numpy.arange(1, 15).reshape(14, 1) * 0.1)
+        self.index = xlcriteria.CriteriaIndex(self.range.buffer)
+
+    def test_matches_scan(self):
+        for criteria in (
+                1, 2, '2', '3', '>1', '>=2', '<2', '<=0', '<>2', 'a', '<>a',
+                '', '=', '<>', True, 'FALSE', '#N/A'):
+            criterion = xlcriteria.parse_criteria(criteria)
+            mask = criterion.mask(self.range)
+            self.assertEqual(
+                self.index.count(criterion), mask.sum(), criteria)
+            self.assertAlmostEqual(
+                self.index.sum(criterion, self.sum_range),
+                self.sum_range.buffer.numbers[mask].sum(),
+                msg=criteria)
+
+    def test_many_criteria(self):
+        criteria = xlcriteria.parse_criteria_array(
+            xltypes.Array([[2, '<>a', ''], ['>=0', 'b', '#N/A']]))
+        self.assertEqual(self.index.counts(criteria), [2, 12, 2, 5, 0, 1])
+        sums = self.index.sums(criteria, self.sum_range)
+        self.assertEqual(len(sums), 6)
+        self.assertAlmostEqual(sums[0], 0.2 + 1.4)
+        self.assertAlmostEqual(sums[4], 0)
+
+    def test_unsupported_criteria(self):
+        for criteria in ('a*', '>a'):
+            criterion = xlcriteria.parse_criteria(criteria)
+            self.assertIsNone(self.index.count(criterion))
+            self.assertIsNone(self.index.sum(criterion, self.sum_range))
+
+    def test_short_sum_range(self):
+        criterion = xlcriteria.parse_criteria(2)
+        sum_range = xltypes.Array([[1], [2], [4]])
+        self.assertEqual(self.index.sum(criterion, sum_range), 2)
+
+    def test_sums_are_cached(self):
+        criterion = xlcriteria.parse_criteria('>=1')
+        self.index.sum(criterion, self.sum_range)
+        misses = self.index._cache.misses
+        self.index.sum(criterion, self.sum_range)
+        self.assertEqual(self.index._cache.misses, misses)
+
+    def test_criteria_index(self):
+        cache = xlcriteria.xl.LRUCache(maxsize=1)
+        with mock.patch('xlfunctions.xlcriteria.CRITERIA_INDEXES', cache):
+            # The index is only used from the second use onward.
+            self.assertIsNone(xlcriteria.criteria_index(self.range))
+            index = xlcriteria.criteria_index(self.range)
+            self.assertIsInstance(index, xlcriteria.CriteriaIndex)
+            # Arrays with the same content share their index.
+            copy = xltypes.Array(self.range.values.tolist()).freeze()
+            self.assertIs(xlcriteria.criteria_index(copy), index)
+            # Unfrozen arrays are not indexed.
+            unfrozen = xltypes.DataFrameArray([[1], [2]])
+            xlcriteria.criteria_index(unfrozen)
+            self.assertIsNone(xlcriteria.criteria_index(unfrozen))
+            self.assertEqual(len(cache), 1)
+
+    def test_criteria_index_disabled(self):
+        cache = xlcriteria.xl.LRUCache(maxsize=0)
+        with mock.patch('xlfunctions.xlcriteria.CRITERIA_INDEXES', cache):
+            xlcriteria.criteria_index(self.range)
+            self.assertIsNone(xlcriteria.criteria_index(self.range))
+
+    def test_criteria_sums(self):
+        criteria = xlcriteria.parse_criteria_array(
+            xltypes.Array([[2, 'a*', '>0']]))
+        sums = xlcriteria.criteria_sums(
+            self.range, criteria, xltypes.Array([[1]] * 14))
+        self.assertEqual(sums, [2, 2, 4])
+
+    def test_parse_criteria_array(self):
+        criteria = xlcriteria.parse_criteria_array(
+            xltypes.Array([['>1', 2]]))
+        self.assertEqual(
+            [repr(criterion) for criterion in criteria],
+            ['<Criterion ><Number 1>>', '<Criterion =<Number 2>>'])
+
+    def test_parse_criteria_with_array(self):
+        with self.assertRaises(xlerrors.ValueExcelError):
+            xlcriteria.parse_criteria(xltypes.Array([['>1', 2]]))
@@ -1,5 +1,9 @@
 import datetime
+import mock
+import numpy
 import operator
+import pandas
+import pickle
 import unittest
 
 from xlfunctions import utils, xlerrors, xltypes
@@ -25,6 +29,27 @@ class ExcelTypeTest(unittest.TestCase):
     def test__repr__(self):
         self.assertEqual(repr(self.MyType(1)), '<MyType 1>')
 
+    def test_cast_from_native(self):
+        cast = xltypes.ExcelType.cast_from_native
+        self.assertIsInstance(cast(1), xltypes.Number)
+        self.assertIsInstance(cast('a'), xltypes.Text)
+        self.assertIsInstance(cast(True), xltypes.Boolean)
+        self.assertIsInstance(cast(None), xltypes.Blank)
+        self.assertIsInstance(
+            cast(datetime.datetime(2020, 1, 1)), xltypes.DateTime)
+        self.assertIsInstance(cast([[1]]), xltypes.Array)
+
+    def test_cast_from_native_with_excel_types(self):
+        cast = xltypes.ExcelType.cast_from_native
+        value = xltypes.Text('a')
+        self.assertIs(cast(value), value)
+        err = xlerrors.NaExcelError()
+        self.assertIs(cast(err), err)
+
+    def test_cast_from_native_with_unknown_type(self):
+        with self.assertRaises(KeyError):
+            xltypes.ExcelType.cast_from_native(object())
+
 
 class AbstractExcelTypeTest:
 
@@ -136,8 +161,11 @@ class AbstractExcelTypeTest:
                 (self.value1 / self.dt2).value, self.num1/self.dt2_float)
 
     def test__pow__(self):
+        value1 = self.value1.value
         res = self.value1 ** self.value2
-        self.assertIsNot(res, self.value1)
+        # Small whole numbers are interned, so `res` may be identical to
+        # `value1`; but `value1` itself must never be modified.
+        self.assertEqual(self.value1.value, value1)
         self.assertIsInstance(res, xltypes.Number)
         self.assertIsInstance(res.value, self.math_result_type)
         self.assertEqual(res.value, self.num1 ** self.num2)
@@ -358,6 +386,54 @@ class TextTest(AbstractExcelTypeTest, unittest.TestCase):
         with self.assertRaises(xlerrors.ValueExcelError):
             xltypes.Text('data').__number__()
 
+    def test__number___with_words(self):
+        self.assertEqual(xltypes.Text('-inf').__number__(), float('-inf'))
+        self.assertEqual(
+            xltypes.Text('May 5, 2020').__number__(),
+            utils.datetime_to_number(datetime.datetime(2020, 5, 5)))
+        self.assertIsInstance(xltypes.Text('Monday').__number__(), float)
+
+    def test__number___does_not_parse_labels(self):
+        with mock.patch('dateutil.parser.parse') as parse:
+            with self.assertRaises(xlerrors.ValueExcelError):
+                xltypes.Text('Revenue (total)').__number__()
+            with self.assertRaises(xlerrors.ValueExcelError):
+                xltypes.Text('Mayday').__datetime__()
+        parse.assert_not_called()
+
+    def test__number___does_not_parse_alphanumeric_labels(self):
+        with mock.patch('dateutil.parser.parse') as parse:
+            for label in ('SKU-7', 'Item 12', 'Q3 2020', 'Mayday 5'):
+                with self.assertRaises(xlerrors.ValueExcelError):
+                    xltypes.Text(label).__number__()
+                with self.assertRaises(xlerrors.ValueExcelError):
+                    xltypes.Text(label).__datetime__()
+        parse.assert_not_called()
+        self.assertEqual(
+            xltypes.Text('March 3rd, 2020 12pm').__datetime__(),
+            datetime.datetime(2020, 3, 3, 12))
+        self.assertEqual(
+            xltypes.Text('2020-01-01T12:00Z').__datetime__().hour, 12)
+        self.assertEqual(xltypes.Text('-1.5E+3').__number__(), -1500)
+
+    def test__number___is_cached(self):
+        xltypes._text_to_number.cache_clear()
+        for _ in range(2):
+            with self.assertRaises(xlerrors.ValueExcelError):
+                xltypes.Text('Total 2020').__number__()
+        info = xltypes._text_to_number.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test__datetime___with_partial_date(self):
+        may = xltypes._text_to_datetime('May', datetime.date(2020, 1, 15))
+        self.assertEqual(may, datetime.datetime(2020, 5, 15))
+        # The current date is part of the cache key.
+        may = xltypes._text_to_datetime('May', datetime.date(2021, 1, 15))
+        self.assertEqual(may, datetime.datetime(2021, 5, 15))
+        self.assertEqual(
+            xltypes.Text('May').__datetime__().year,
+            datetime.date.today().year)
+
     def test__bool__(self):
         self.assertEqual(bool(xltypes.Text('true')), True)
         self.assertEqual(bool(xltypes.Text('false')), False)
@@ -591,12 +667,78 @@ class BlankTest(unittest.TestCase):
         self.assertEqual(repr(xltypes.BLANK), '<BLANK>')
 
 
+class InternedValuesTest(unittest.TestCase):
+
+    def test_Boolean(self):
+        self.assertIs(xltypes.Boolean(True), xltypes.TRUE)
+        self.assertIs(xltypes.Boolean(False), xltypes.FALSE)
+        self.assertIs(xltypes.Number(1) == 1, xltypes.TRUE)
+
+    def test_Number(self):
+        self.assertIs(xltypes.Number(0), xltypes.Number(0))
+        self.assertIs(xltypes.Number(1) + 2, xltypes.Number(3))
+        self.assertIsNot(xltypes.Number(1000), xltypes.Number(1000))
+        self.assertIsInstance(xltypes.Number(1.0).value, float)
+
+    def test_Blank(self):
+        self.assertIs(xltypes.Blank(), xltypes.BLANK)
+        self.assertIs(xltypes.Blank.cast(None), xltypes.BLANK)
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            xltypes.TRUE.value = False
+        with self.assertRaises(AttributeError):
+            xltypes.Number(1).value = 2
+        self.assertIs(xltypes.TRUE.value, True)
+
+    def test_pickle(self):
+        self.assertIs(pickle.loads(pickle.dumps(xltypes.TRUE)), xltypes.TRUE)
+        self.assertIs(
+            pickle.loads(pickle.dumps(xltypes.BLANK)), xltypes.BLANK)
+        self.assertEqual(
+            pickle.loads(pickle.dumps(xltypes.Text('a'))).value, 'a')
+
+
 class ArrayTest(unittest.TestCase):
 
+    backend = 'numpy'
+
+    def setUp(self):
+        patcher = mock.patch('xlfunctions.xltypes.ARRAY_BACKEND', self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test__init__(self):
+        array = xltypes.Array([[1, 'a'], [None, True]])
+        self.assertIsInstance(array, xltypes.Array)
+        self.assertIsInstance(
+            array, xltypes.ARRAY_BACKENDS[self.backend])
+        self.assertEqual(array.shape, (2, 2))
+        self.assertIsInstance(array.values[0, 1], xltypes.Text)
+        self.assertIs(array.values[1, 0], xltypes.BLANK)
+
     def test__init__withbad_data(self):
         with self.assertRaises(xlerrors.ValueExcelError):
             xltypes.Array('bad')
 
+    def test__init__with_flat_list(self):
+        array = xltypes.Array([1, 2, 3])
+        self.assertEqual(array.shape, (3, 1))
+
+    def test__init__with_empty_list(self):
+        self.assertEqual(xltypes.Array([]).shape, (0, 0))
+
+    def test_cast(self):
+        array = xltypes.Array([[1]])
+        self.assertIs(xltypes.Array.cast(array), array)
+        self.assertEqual(xltypes.Array.cast(1).flat, [1])
+        self.assertEqual(xltypes.Array.cast([[1, 2]]).shape, (1, 2))
+
+    def test_to_frame(self):
+        frame = xltypes.Array([[1, 2], [3, 4]]).to_frame()
+        self.assertIs(type(frame), pandas.DataFrame)
+        self.assertEqual(frame.shape, (2, 2))
+
     def test_flat(self):
         self.assertEqual(
             xltypes.Array([[1, 2, 3], [4, 5, 6]]).flat,
@@ -610,6 +752,12 @@ class ArrayTest(unittest.TestCase):
         self.assertIsInstance(nums[0][0], xltypes.Number)
         self.assertEqual(nums.flat, [1, 0.0, 5.0, 4.0, 1, 6])
 
+    def test_cast_to_numbers_keeps_integers(self):
+        array = xltypes.Array([[1, 2.0, '3', '4.5', True, None]])
+        self.assertEqual(
+            [type(number.value) for number in array.cast_to_numbers().flat],
+            [int, float, int, float, int, float])
+
     def test_cast_to_numbers_with_errors(self):
         array = xltypes.Array([[1, object()]])
         nums = array.cast_to_numbers()
@@ -631,6 +779,265 @@ class ArrayTest(unittest.TestCase):
             texts.flat,
             ['1', '', '1900-01-05 00:00:00', '4.0', 'True', '6'])
 
+    def test_cast_to_numbers_with_error_values(self):
+        array = xltypes.Array([['1', 'bad', xlerrors.NaExcelError()]])
+        self.assertEqual(array.cast_to_numbers().flat, [1, 0, 0])
+
+    def test_cast_to_booleans_with_texts(self):
+        array = xltypes.Array([['TRUE', 'false', 'bad', 0]])
+        self.assertEqual(
+            array.cast_to_booleans().flat, [True, False, True, False])
+
+    def test_from_numbers(self):
+        array = xltypes.Array.from_numbers(numpy.array([[1.0, 2.5]]))
+        self.assertIsInstance(array, xltypes.ARRAY_BACKENDS[self.backend])
+        self.assertEqual(array.shape, (1, 2))
+        self.assertEqual(array.flat, [1, 2.5])
+        self.assertIsInstance(array.values[0, 0], xltypes.Number)
+
+    def test_from_buffer(self):
+        buffer = xltypes.ArrayBuffer.from_numbers([1, 2])
+        array = xltypes.Array.from_buffer(buffer)
+        self.assertIsInstance(array, xltypes.ARRAY_BACKENDS[self.backend])
+        self.assertEqual(array.shape, (2, 1))
+        self.assertEqual(array.flat, [1, 2])
+
+    def test_buffer(self):
+        dt = datetime.datetime(1900, 1, 5)
+        array = xltypes.Array([[1, None, dt], ['a', True, object()]])
+        buffer = array.buffer
+        self.assertIs(array.buffer, buffer)
+        self.assertEqual(buffer.shape, (2, 3))
+        self.assertEqual(
+            buffer.tags.tolist(), [
+                xltypes.TAG_NUMBER, xltypes.TAG_BLANK, xltypes.TAG_DATETIME,
+                xltypes.TAG_TEXT, xltypes.TAG_BOOLEAN, xltypes.TAG_OTHER])
+        self.assertEqual(buffer.numbers.tolist(), [1, 0, 5, 0, 1, 0])
+        self.assertEqual(buffer.texts[3], 'a')
+
+    def test_cached_views(self):
+        array = xltypes.Array([[1, 'a'], [True, None]])
+        self.assertIs(array.flat, array.flat)
+        self.assertIs(array.cast_to_numbers(), array.cast_to_numbers())
+        self.assertIs(array.cast_to_booleans(), array.cast_to_booleans())
+        self.assertIs(array.cast_to_texts(), array.cast_to_texts())
+
+    def test_flatten(self):
+        array = xltypes.Array([[1, 'a'], [0, '2']])
+        # Without a filter function, all false values are dropped.
+        self.assertEqual(array.flatten(), [1, 'a', '2'])
+        self.assertEqual(array.flatten(xltypes.Number), [1, 2])
+        self.assertEqual(
+            array.flatten(filt=lambda x: True), [1, 'a', 0, '2'])
+
+    def test_first_error(self):
+        self.assertIsNone(xltypes.Array([[1, 'a']]).first_error)
+        err = xlerrors.NaExcelError()
+        array = xltypes.Array([[1, err], [xlerrors.NumExcelError(), 2]])
+        self.assertIs(array.first_error, err)
+
+    def test_fingerprint(self):
+        array1 = xltypes.Array([[0.0, 'a'], [True, None]])
+        array2 = xltypes.Array([[-0.0, 'a'], [True, None]])
+        self.assertEqual(array1.fingerprint, array2.fingerprint)
+
+    def test_fingerprint_with_datetime64(self):
+        dt = datetime.datetime(2020, 1, 1, 12)
+        array1 = xltypes.Array([[xltypes.DateTime(dt)]])
+        array2 = xltypes.Array([[xltypes.DateTime(numpy.datetime64(dt))]])
+        self.assertEqual(array1.fingerprint, array2.fingerprint)
+
+    def test_fingerprint_with_different_values(self):
+        fingerprint = xltypes.Array([[1, 'a']]).fingerprint
+        for data in ([[1, 'b']], [[2, 'a']], [[1], ['a']], [[True, 'a']],
+                     [['1', 'a']], [[xlerrors.NaExcelError(), 'a']],
+                     [[1.0, 'a']]):
+            self.assertNotEqual(
+                xltypes.Array(data).fingerprint, fingerprint, data)
+
+    def test_fingerprint_with_dates(self):
+        dt = datetime.datetime(2020, 1, 1)
+        self.assertEqual(
+            xltypes.Array([[dt]]).fingerprint,
+            xltypes.Array([[dt]]).fingerprint)
+        self.assertNotEqual(
+            xltypes.Array([[dt]]).fingerprint,
+            xltypes.Array([[dt.replace(microsecond=1)]]).fingerprint)
+
+    def test_freeze(self):
+        array = xltypes.Array([[1, 'a']])
+        frozen = array.freeze()
+        self.assertTrue(frozen.frozen)
+        self.assertEqual(frozen.flat, [1, 'a'])
+        self.assertEqual(frozen.fingerprint, array.fingerprint)
+        self.assertEqual({frozen: 1}[xltypes.Array([[1, 'a']]).freeze()], 1)
+
+    def test_vector(self):
+        noon = datetime.datetime(2020, 1, 1, 12)
+        array = xltypes.Array([[1, 'a', noon], ['b', 2, 3]])
+        self.assertEqual(array.vector(1).flat, ['b', 2, 3])
+        column = array.vector(2, axis=1)
+        self.assertEqual(column.shape, (2, 1))
+        self.assertEqual([cell.value for cell in column.flat], [noon, 3])
+
+
+class DataFrameArrayTest(ArrayTest):
+
+    backend = 'pandas'
+
+    def test_frozen(self):
+        array = xltypes.Array([[1]])
+        self.assertFalse(array.frozen)
+        self.assertIsNot(array.freeze(), array)
+        with self.assertRaises(TypeError):
+            hash(array)
+
+
+class ArrayBufferTest(unittest.TestCase):
+
+    def test_from_values(self):
+        values = xltypes.Array([[1, 'a'], [xlerrors.NumExcelError(), None]])
+        buffer = xltypes.ArrayBuffer.from_values(values.values)
+        self.assertEqual(buffer.size, 4)
+        self.assertEqual(buffer.errors[2], xlerrors.ERROR_CODES.index('#NUM!'))
+        self.assertEqual(
+            buffer.mask(xltypes.TAG_TEXT, xltypes.TAG_BLANK).tolist(),
+            [False, True, False, True])
+
+    def test_from_values_with_native_values(self):
+        values = numpy.array([[1, 'a']], dtype=object)
+        buffer = xltypes.ArrayBuffer.from_values(values)
+        self.assertEqual(
+            buffer.tags.tolist(), [xltypes.TAG_NUMBER, xltypes.TAG_TEXT])
+        self.assertEqual(buffer.numbers[0], 1)
+
+    def test_from_numbers(self):
+        buffer = xltypes.ArrayBuffer.from_numbers([1, 2, 3])
+        self.assertEqual(buffer.shape, (3, 1))
+        self.assertEqual(buffer.numbers.dtype, numpy.float64)
+
+    def test_from_booleans(self):
+        buffer = xltypes.ArrayBuffer.from_booleans([[True, False]])
+        self.assertEqual(
+            buffer.to_values().tolist(), [[xltypes.TRUE, xltypes.FALSE]])
+
+    def test_vector(self):
+        buffer = xltypes.Array([[1, 'a', 2], ['b', 3, 4]]).buffer
+        row = buffer.vector(1)
+        self.assertEqual(row.shape, (1, 3))
+        self.assertEqual(row.to_values().tolist(), [['b', 3, 4]])
+        column = buffer.vector(1, axis=1)
+        self.assertEqual(column.shape, (2, 1))
+        self.assertEqual(column.to_values().tolist(), [['a'], [3]])
+        self.assertIsNone(column.errors)
+        # The cells are not copied.
+        self.assertTrue(numpy.shares_memory(column.numbers, buffer.numbers))
+        self.assertTrue(numpy.shares_memory(row.texts, buffer.texts))
+
+    def test_to_values(self):
+        dt = datetime.datetime(1900, 1, 5)
+        array = xltypes.Array(
+            [[1, None, dt], ['a', True, xlerrors.NaExcelError()]])
+        values = array.buffer.to_values()
+        self.assertEqual(values.shape, (2, 3))
+        self.assertEqual(values[0, 0], 1)
+        self.assertIs(values[0, 1], xltypes.BLANK)
+        self.assertEqual(values[0, 2].value, dt)
+        self.assertEqual(values[1, 0], 'a')
+        self.assertIs(values[1, 1], xltypes.TRUE)
+        self.assertIsInstance(values[1, 2], xlerrors.NaExcelError)
+
+    def test_to_values_keeps_integers(self):
+        buffer = xltypes.Array([[1, 2.0, numpy.int64(3), 2 ** 60]]).buffer
+        self.assertEqual(
+            [type(number.value) for number in buffer.to_values().flat],
+            [int, float, int, float])
+
+    def test_to_values_with_other_values(self):
+        buffer = xltypes.Array([[object()]]).buffer
+        with self.assertRaises(ValueError):
+            buffer.to_values()
+
+
+class NumpyArrayTest(unittest.TestCase):
+
+    def test_from_numbers(self):
+        array = xltypes.NumpyArray.from_numbers(numpy.zeros(3))
+        self.assertEqual(array.shape, (3, 1))
+        # The object array is only created on demand.
+        self.assertIsNone(array._values)
+        self.assertEqual(array.flat, [0, 0, 0])
+        self.assertIsNotNone(array._values)
+
+    def test__init__with_ragged_rows(self):
+        with self.assertRaises(xlerrors.ValueExcelError):
+            xltypes.NumpyArray([[1, 2], [3]])
+
+    def test__init__with_nested_array(self):
+        inner = xltypes.NumpyArray([[1, 2]])
+        array = xltypes.NumpyArray([[inner]])
+        self.assertEqual(array.shape, (1, 1))
+        self.assertIs(array.values[0, 0], inner)
+
+    def test__init__with_ndarray(self):
+        array = xltypes.NumpyArray(numpy.array([[1, 2], [3, 4]]))
+        self.assertIsInstance(array.values[0, 0], xltypes.Number)
+        self.assertEqual(array.flat, [1, 2, 3, 4])
+
+    def test_frozen(self):
+        array = xltypes.NumpyArray([[1, 'a']])
+        self.assertTrue(array.frozen)
+        self.assertIs(array.freeze(), array)
+
+    def test_vector_shares_cells(self):
+        array = xltypes.NumpyArray([[1, 'a'], [2, 'b']])
+        array.buffer
+        column = array.vector(1, axis=1)
+        self.assertEqual(column.flat, ['a', 'b'])
+        self.assertTrue(numpy.shares_memory(column.values, array.values))
+        self.assertTrue(
+            numpy.shares_memory(column.buffer.texts, array.buffer.texts))
+
+    def test_vector_of_buffer(self):
+        array = xltypes.NumpyArray.from_numbers(
+            numpy.arange(6).reshape(3, 2))
+        column = array.vector(1, axis=1)
+        self.assertIsNone(array._values)
+        self.assertIsNone(column._values)
+        self.assertTrue(
+            numpy.shares_memory(column.buffer.numbers, array.buffer.numbers))
+        self.assertEqual(column.flat, [1, 3, 5])
+        self.assertEqual(array.vector(2).flat, [4, 5])
+
+    def test__eq__(self):
+        array = xltypes.NumpyArray([[1, 'a']])
+        self.assertEqual(array, xltypes.NumpyArray([[1, 'a']]))
+        self.assertNotEqual(array, xltypes.NumpyArray([[1, 'b']]))
+        self.assertNotEqual(array, xltypes.NumpyArray([[1], ['a']]))
+        self.assertNotEqual(array, 1)
+
+    def test__hash__(self):
+        cache = {xltypes.NumpyArray([[1, 'a']]): 'value'}
+        self.assertEqual(cache[xltypes.NumpyArray([[1, 'a']])], 'value')
+        self.assertNotIn(xltypes.NumpyArray([[1, 'b']]), cache)
+
+    def test_immutable(self):
+        array = xltypes.NumpyArray([[1, 2]])
+        with self.assertRaises(ValueError):
+            array.values[0, 0] = xltypes.Number(3)
+        with self.assertRaises(ValueError):
+            array.buffer.numbers[0] = 3
+
+    def test__init__without_fromiter_support(self):
+        with mock.patch('numpy.fromiter', side_effect=ValueError):
+            array = xltypes.NumpyArray([[1, 2], [3, 4]])
+        self.assertEqual(array.shape, (2, 2))
+        self.assertEqual(array.flat, [1, 2, 3, 4])
+
+    def test__repr__(self):
+        self.assertEqual(
+            repr(xltypes.NumpyArray([[1]])), '<NumpyArray [[<Number 1>]]>')
+
 
 class ExprTest(unittest.TestCase):
 
@@ -39,7 +39,7 @@ def DATE(
     return result
 
 
-@xl.register()
+@xl.register(volatile=True)
 def TODAY() -> xltypes.XlDateTime:
     """Returns the serial number of the current date.
 
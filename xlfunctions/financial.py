@@ -1,10 +1,11 @@
+import numpy
 import numpy_financial
 from typing import Tuple
 
-from . import xl, xlerrors, xltypes
+from . import utils, xl, xlerrors, xltypes
 
 
-@xl.register()
+@xl.register(cost=xl.COST_EXPENSIVE)
 @xl.validate_args
 def IRR(
         values: xltypes.XlArray,
@@ -20,7 +21,7 @@ def IRR(
     return numpy_financial.irr(xl.flatten(values))
 
 
-@xl.register()
+@xl.register(vectorized=True)
 @xl.validate_args
 def NPV(
         rate: xltypes.XlNumber,
@@ -42,10 +43,9 @@ def NPV(
     if xl.COMPATIBILITY == 'PYTHON':
         return numpy_financial.npv(rate, cashflow)
 
-    return sum([
-        val * (1 + rate)**-(i+1)
-        for (i, val) in enumerate(cashflow)
-    ])
+    cashflow = numpy.array(cashflow)
+    periods = numpy.arange(1, len(cashflow) + 1)
+    return utils.sum_numbers(cashflow * (1 + rate)**-periods)
 
 
 @xl.register()
@@ -193,7 +193,7 @@ def VDB(
     return result
 
 
-@xl.register()
+@xl.register(vectorized=True)
 @xl.validate_args
 def XNPV(
         rate: xltypes.XlNumber,
@@ -215,7 +215,10 @@ def XNPV(
             f'`values` range must be the same length as `dates` range '
             f'in XNPV, {len(values)} != {len(dates)}')
 
-    def npv(value, date):
-        return value / ((1.0 + rate) ** ((date - dates[0]) / 365))
+    if not len(values):
+        return 0
 
-    return sum([npv(value, date) for value, date in zip(values, dates)])
+    values = numpy.array([float(value) for value in values])
+    dates = numpy.array([float(date) for date in dates])
+    return utils.sum_numbers(
+        values / (1.0 + float(rate)) ** ((dates - dates[0]) / 365))
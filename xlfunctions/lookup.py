@@ -1,6 +1,161 @@
+import numpy
+
 from . import xl, xlerrors, xltypes
 
 
+def _typed_keys(buffer, positions):
+    """Return the lookup keys and positions (in `positions`) of the numbers
+    (and date/times), booleans and texts (lower case) at the positions of a
+    buffer, by type."""
+    tags = buffer.tags[positions]
+    numbers = buffer.numbers[positions]
+    is_number = (tags == xltypes.TAG_NUMBER) | (tags == xltypes.TAG_DATETIME)
+    is_boolean = tags == xltypes.TAG_BOOLEAN
+    is_text = tags == xltypes.TAG_TEXT
+    texts = []
+    if is_text.any():
+        texts = [text.lower() for text in buffer.texts[positions][is_text]]
+    return {
+        'number': (numbers[is_number], numpy.flatnonzero(is_number)),
+        'boolean': (numbers[is_boolean], numpy.flatnonzero(is_boolean)),
+        'text': (numpy.array(texts, dtype=str), numpy.flatnonzero(is_text)),
+    }
+
+
+class LookupIndex:
+    """Index of a vector of cells (a column or row) for lookups.
+
+    Values are matched like by Excel: texts are compared case-insensitively,
+    and numbers (and date/times), texts and booleans never match each other.
+    Exact matches are found in a map of the values to their first position,
+    approximate matches (and many values at once) by binary search over the
+    sorted values of the same type. Both are built on first use.
+    """
+
+    def __init__(self, buffer, positions):
+        self._cells = _typed_keys(buffer, positions)
+        self._exact = {}
+        self._sorted = {}
+
+    @staticmethod
+    def _key(value):
+        """Return the type and key of a lookup value."""
+        if isinstance(value, xlerrors.ExcelError):
+            raise value
+        if isinstance(value, xltypes.Text):
+            return 'text', value.value.lower()
+        if isinstance(value, xltypes.Boolean):
+            return 'boolean', float(value.value)
+        if isinstance(value, (xltypes.Number, xltypes.DateTime)):
+            return 'number', float(value.__number__())
+        return None, None
+
+    def _sorted_cells(self, kind):
+        if kind not in self._sorted:
+            keys, positions = self._cells[kind]
+            # The sort is stable, so that the first of equal keys is the
+            # first in the vector.
+            order = numpy.argsort(keys, kind='stable')
+            self._sorted[kind] = (keys[order], positions[order])
+        return self._sorted[kind]
+
+    def find(self, value):
+        """Return the position of the first cell equal to the value, or
+        `None` if there is none."""
+        kind, key = self._key(value)
+        if kind is None:
+            return None
+        if kind not in self._exact:
+            keys, positions = self._cells[kind]
+            # Inserting in reverse order keeps the first position of
+            # duplicates.
+            self._exact[kind] = dict(
+                zip(keys[::-1].tolist(), positions[::-1].tolist()))
+        return self._exact[kind].get(key)
+
+    def find_sorted(self, value, match_type=1, first=False):
+        """Return the position of the largest value less than or equal to
+        the value (the smallest greater than or equal to it if `match_type`
+        is -1), or `None` if there is none.
+
+        Only cells of the same type as the value are considered. Of equal
+        values, the last is returned, like Excel does for sorted vectors;
+        or the first if `first` is true, like `XLOOKUP()` does.
+        """
+        kind, key = self._key(value)
+        if kind is None:
+            return None
+        position = self._search(
+            kind, numpy.array([key]), match_type, first)[0]
+        return None if position < 0 else int(position)
+
+    def _search(self, kind, keys, match_type, first=False):
+        """Return the positions of the cells matching the keys (of the same
+        type), or -1."""
+        sorted_keys, positions = self._sorted_cells(kind)
+        size = sorted_keys.size
+        if match_type == 0:
+            idx = numpy.searchsorted(sorted_keys, keys, side='left')
+            found = idx < size
+            found[found] = sorted_keys[idx[found]] == keys[found]
+        elif match_type > 0:
+            idx = numpy.searchsorted(sorted_keys, keys, side='right') - 1
+            found = idx >= 0
+            if first:
+                idx[found] = numpy.searchsorted(
+                    sorted_keys, sorted_keys[idx[found]], side='left')
+        else:
+            idx = numpy.searchsorted(sorted_keys, keys, side='left')
+            found = idx < size
+            if not first:
+                idx[found] = numpy.searchsorted(
+                    sorted_keys, sorted_keys[idx[found]], side='right') - 1
+        return numpy.where(found, positions[numpy.where(found, idx, 0)], -1)
+
+    def find_many(self, buffer, match_type=0, first=False):
+        """Find the cells of a buffer at once, like `find()` (`match_type`
+        0) or `find_sorted()`.
+
+        Returns the positions (-1 if not found) and the error indexes of the
+        cells that are errors (-1 for all others).
+        """
+        positions = numpy.full(buffer.size, -1, dtype=numpy.intp)
+        for kind, (keys, cells) in _typed_keys(
+                buffer, numpy.arange(buffer.size)).items():
+            if cells.size and self._cells[kind][0].size:
+                positions[cells] = self._search(
+                    kind, keys, match_type, first)
+        codes = numpy.full(buffer.size, -1, dtype=numpy.int8)
+        is_error = buffer.tags == xltypes.TAG_ERROR
+        if is_error.any():
+            codes[is_error] = buffer.errors[is_error]
+        return positions, codes
+
+
+# Lookup indexes of frozen arrays by their content. Set the size to 0 to
+# disable them.
+LOOKUP_INDEXES = xl.LRUCache(maxsize=16)
+
+
+def lookup_index(array, axis=0):
+    """Return the `LookupIndex` of the first column of an array, or of its
+    first row if `axis` is 1.
+
+    Indexes of frozen arrays are cached, so that all lookups in the same
+    table share them.
+    """
+    def create():
+        buffer = array.buffer
+        rows, cols = buffer.shape
+        if axis == 0:
+            return LookupIndex(buffer, numpy.arange(rows) * cols)
+        return LookupIndex(buffer, numpy.arange(cols))
+
+    if not array.frozen:
+        return create()
+    return LOOKUP_INDEXES.get((array.shape, array.fingerprint, axis), create)
+
+
 @xl.register()
 @xl.validate_args
 def CHOOSE(
@@ -25,6 +180,166 @@ def CHOOSE(
     return values[idx]
 
 
+_ERROR_INDEX_REF = xlerrors.ERROR_CODES.index(xlerrors.ERROR_CODE_REF)
+_ERROR_INDEX_NA = xlerrors.ERROR_CODES.index(xlerrors.ERROR_CODE_NA)
+
+
+def _take(array, indexes, codes, fill, shape):
+    """Create an array of the cells of an array at flat indexes.
+
+    Cells with an index of -1 are `fill`; cells with an error index (>= 0
+    in `codes`) are that error.
+    """
+    found = indexes >= 0
+    cells = numpy.empty(indexes.size, dtype=object)
+    cells[found] = array.values.ravel()[indexes[found]]
+    cells[~found] = fill
+    for idx in numpy.flatnonzero(codes >= 0).tolist():
+        code = xlerrors.ERROR_CODES[codes[idx]]
+        cells[idx] = xlerrors.ERRORS_BY_CODE[code]()
+    return xltypes.Array(cells.reshape(shape))
+
+
+def _find(index, lookup_value, match_type):
+    if match_type == 0:
+        position = index.find(lookup_value)
+    else:
+        position = index.find_sorted(lookup_value, match_type)
+    if position is None:
+        raise xlerrors.NaExcelError('`lookup_value` not found.')
+    return position
+
+
+@xl.register()
+@xl.validate_args
+def HLOOKUP(
+        lookup_value: xltypes.XlAnything,
+        table_array: xltypes.XlArray,
+        row_index_num: xltypes.XlNumber,
+        range_lookup=False
+) -> xltypes.XlAnything:
+    """Looks in the top row of an array and returns the value of the
+    indicated cell.
+
+    https://support.office.com/en-us/article/
+        hlookup-function-a3034eec-b719-4ba3-bb65-e1ad662ed95f
+    """
+    row_index_num = int(row_index_num)
+
+    if row_index_num < 1:
+        raise xlerrors.ValueExcelError('row_index_num must be at least 1')
+
+    if row_index_num > len(table_array.values):
+        raise xlerrors.ValueExcelError(
+            'row_index_num is greater than the number of rows in table_array')
+
+    col = _find(
+        lookup_index(table_array, axis=1), lookup_value,
+        1 if range_lookup else 0)
+    return table_array.values[row_index_num - 1][col]
+
+
+@xl.register()
+@xl.validate_args
+def INDEX(
+        array: xltypes.XlArray,
+        row_num: xltypes.XlAnything,
+        column_num: xltypes.XlNumber = None
+) -> xltypes.XlAnything:
+    """Returns the value of an element in a table or an array, selected by
+    the row and column number indexes.
+
+    A `row_num` (`column_num`) of 0 returns the whole column (row), sharing
+    the cells of `array` rather than copying them. An array of row numbers
+    returns the array of the selected cells.
+
+    https://support.office.com/en-us/article/
+        index-function-a5dcf0dd-996d-40a4-a822-b56b061328bd
+    """
+    rows, cols = array.shape
+    if column_num is None:
+        # The number indexes the cells of a single row, or selects rows.
+        if rows == 1:
+            row_num, column_num = 1, row_num
+        else:
+            column_num = 1 if cols == 1 else 0
+
+    if isinstance(row_num, xltypes.Array):
+        return _index_cells(array, row_num, int(column_num))
+    if isinstance(column_num, xltypes.Array):
+        raise xlerrors.ValueExcelError('`column_num` must be a number.')
+
+    row_num = int(xltypes.Number.cast(row_num))
+    column_num = int(column_num)
+    if row_num < 0 or column_num < 0:
+        raise xlerrors.ValueExcelError('Indexes must not be negative.')
+    if row_num > rows or column_num > cols:
+        raise xlerrors.RefExcelError('Index out of range.')
+
+    if not row_num and not column_num:
+        return array
+    if not row_num:
+        return array.vector(column_num - 1, axis=1)
+    if not column_num:
+        return array.vector(row_num - 1)
+    return array.values[row_num - 1][column_num - 1]
+
+
+def _index_cells(array, row_nums, column_num):
+    """Select the cells of the rows at `row_nums` (an array) in a column of
+    an array, with #REF! for rows out of range."""
+    rows, cols = array.shape
+    if not 1 <= column_num <= cols:
+        raise xlerrors.RefExcelError('Index out of range.')
+
+    buffer = row_nums.buffer
+    codes = numpy.full(buffer.size, -1, dtype=numpy.int8)
+    is_error = buffer.tags == xltypes.TAG_ERROR
+    if is_error.any():
+        codes[is_error] = buffer.errors[is_error]
+    numbers = row_nums.cast_to_numbers().buffer.numbers.astype(numpy.intp)
+    valid = (numbers >= 1) & (numbers <= rows)
+    codes[~valid & ~is_error] = _ERROR_INDEX_REF
+    indexes = numpy.where(valid, (numbers - 1) * cols + column_num - 1, -1)
+    return _take(
+        array, indexes, codes, xlerrors.RefExcelError(), row_nums.shape)
+
+
+@xl.register()
+@xl.validate_args
+def MATCH(
+        lookup_value: xltypes.XlAnything,
+        lookup_array: xltypes.XlArray,
+        match_type: xltypes.XlNumber = 1
+) -> xltypes.XlNumber:
+    """Looks up an item in a row or column and returns its relative
+    position.
+
+    With a `match_type` of 1 (-1), the position of the largest (smallest)
+    value that is less (greater) than or equal to `lookup_value` is
+    returned, assuming that the values are sorted in ascending (descending)
+    order.
+
+    https://support.office.com/en-us/article/
+        match-function-e8dffd45-c762-47d6-bf89-533f4a37673a
+    """
+    rows, cols = lookup_array.shape
+    if rows != 1 and cols != 1:
+        raise xlerrors.NaExcelError('`lookup_array` must be a row or column.')
+
+    match_type = (match_type > 0) - (match_type < 0)
+    index = lookup_index(lookup_array, axis=1 if rows == 1 else 0)
+    if isinstance(lookup_value, xltypes.Array):
+        # Array lookup values give an array of positions.
+        positions, codes = index.find_many(lookup_value.buffer, match_type)
+        codes[(positions < 0) & (codes < 0)] = _ERROR_INDEX_NA
+        return xl.result_array(
+            (positions + 1).reshape(lookup_value.shape),
+            codes.reshape(lookup_value.shape))
+
+    return _find(index, lookup_value, match_type) + 1
+
+
 @xl.register()
 @xl.validate_args
 def VLOOKUP(
@@ -39,19 +354,90 @@ def VLOOKUP(
     https://support.office.com/en-us/article/
         vlookup-function-0bbc8083-26fe-4963-8ab8-93a18ad188a1
     """
-    if range_lookup:
-        raise NotImplementedError("Excact match only supported at the moment.")
-
     col_index_num = int(col_index_num)
 
+    if col_index_num < 1:
+        raise xlerrors.ValueExcelError('col_index_num must be at least 1')
+
     if col_index_num > len(table_array.values[0]):
         raise xlerrors.ValueExcelError(
             'col_index_num is greater than the number of cols in table_array')
 
-    table_array = table_array.set_index(0)
+    index = lookup_index(table_array)
+    match_type = 1 if range_lookup else 0
+    if isinstance(lookup_value, xltypes.Array):
+        # Array lookup values give an array of results.
+        rows, codes = index.find_many(lookup_value.buffer, match_type)
+        cols = table_array.shape[1]
+        indexes = numpy.where(rows < 0, -1, rows * cols + col_index_num - 1)
+        return _take(
+            table_array, indexes, codes, xlerrors.NaExcelError(),
+            lookup_value.shape)
+
+    row = _find(index, lookup_value, match_type)
+    return table_array.values[row][col_index_num - 1]
+
+
+@xl.register()
+@xl.validate_args
+def XLOOKUP(
+        lookup_value: xltypes.XlAnything,
+        lookup_array: xltypes.XlArray,
+        return_array: xltypes.XlArray,
+        if_not_found=None,
+        match_mode: xltypes.XlNumber = 0
+) -> xltypes.XlAnything:
+    """Searches a range or an array, and returns an item corresponding to
+    the first match it finds.
+
+    A `match_mode` of -1 (1) returns the next smaller (larger) item if there
+    is no exact match. Wildcard matches (2) are not supported.
+
+    https://support.office.com/en-us/article/
+        xlookup-function-b7fd680e-6d10-43e6-84f9-88eae8bf5929
+    """
+    rows, cols = lookup_array.shape
+    if rows != 1 and cols != 1:
+        raise xlerrors.ValueExcelError(
+            '`lookup_array` must be a row or column.')
+    axis = 1 if rows == 1 else 0
+    if return_array.shape[axis] != lookup_array.shape[axis]:
+        raise xlerrors.ValueExcelError(
+            '`return_array` must have the size of `lookup_array`.')
+    match_mode = int(match_mode)
+    if match_mode not in (-1, 0, 1):
+        raise xlerrors.ValueExcelError(
+            f'Unsupported `match_mode` {match_mode}.')
+
+    if if_not_found is None:
+        if_not_found = xlerrors.NaExcelError()
+    index = lookup_index(lookup_array, axis=axis)
+    # Next smaller items are found like approximate matches of type 1.
+    match_type = -match_mode
+
+    if isinstance(lookup_value, xltypes.Array):
+        if return_array.shape[1 - axis] != 1:
+            raise xlerrors.ValueExcelError(
+                '`return_array` must be a row or column for array lookups.')
+        positions, codes = index.find_many(lookup_value.buffer)
+        if match_type:
+            missing = positions < 0
+            positions[missing] = index.find_many(
+                lookup_value.buffer, match_type, first=True)[0][missing]
+        return _take(
+            return_array, positions, codes, if_not_found, lookup_value.shape)
 
-    if lookup_value not in table_array.index:
-        raise xlerrors.NaExcelError(
-            '`lookup_value` not in first column of `table_array`.')
+    position = index.find(lookup_value)
+    if position is None and match_type:
+        position = index.find_sorted(lookup_value, match_type, first=True)
+    if position is None:
+        return if_not_found
 
-    return table_array.loc[lookup_value].values[0]
+    values = return_array.values
+    if axis == 1:
+        values = values.T
+    if values.shape[1] == 1:
+        return values[position][0]
+    # Several return rows (columns) give a row (column) of results.
+    result = values[position:position + 1]
+    return xltypes.Array(result if axis == 0 else result.T)
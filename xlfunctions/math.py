@@ -1,14 +1,18 @@
 import decimal
 import math
 import numpy
-import pandas
 from typing import Tuple
 
-from . import xl, xlerrors, xltypes, xlcriteria
+from . import utils, xl, xlerrors, xltypes, xlcriteria
+
+
+def _abs_kernel(number):
+    return numpy.abs(number), ()
 
 
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_abs_kernel)
 def ABS(
         number: xltypes.XlNumber
 ) -> xltypes.XlNumber:
@@ -20,8 +24,13 @@ def ABS(
     return abs(number)
 
 
+def _ln_kernel(number):
+    return numpy.log(number), [(number <= 0, xlerrors.NumExcelError)]
+
+
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_ln_kernel)
 def LN(
         number: xltypes.XlNumber
 ) -> xltypes.XlNumber:
@@ -33,8 +42,16 @@ def LN(
     return math.log(number)
 
 
+def _mod_kernel(number, divisor):
+    return (
+        numpy.mod(number, divisor),
+        [(divisor == 0, xlerrors.DivZeroExcelError)]
+    )
+
+
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_mod_kernel)
 def MOD(
         number: xltypes.XlNumber,
         divisor: xltypes.XlNumber
@@ -59,8 +76,16 @@ def PI() -> xltypes.XlNumber:
     return math.pi
 
 
+def _power_kernel(number, power):
+    return (
+        numpy.power(number, power),
+        [((number == 0) & (power < 0), xlerrors.DivZeroExcelError)]
+    )
+
+
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_power_kernel)
 def POWER(
         number: xltypes.XlNumber,
         power: xltypes.XlNumber
@@ -73,8 +98,76 @@ def POWER(
     return numpy.power(number, power)
 
 
+def _shift(numbers, digits):
+    """Multiply numbers by 10 ** digits.
+
+    The result is correctly rounded for integers, as 10 ** abs(digits) is
+    exact (for up to 22 digits).
+    """
+    power = 10.0 ** numpy.abs(digits)
+    return numpy.where(digits >= 0, numbers * power, numbers / power)
+
+
+def _rounding_kernel(rounder, rounding):
+    """Create a kernel rounding away from zero using the rounder.
+
+    Like the scalar functions, which round `decimal.Decimal(str(number))`,
+    numbers are rounded as their shortest decimal representation, e.g. 2.675
+    rounds up to 2.68 like it does in Excel. To stay vectorized, the kernel
+    compares numbers with the floats nearest to the decimals that decide the
+    result: `truncated` is the largest integer for which
+    `truncated * 10 ** -digits` is not above the number. The rounder is
+    called with it, the absolute numbers and the digits and returns the
+    rounded integers.
+
+    Floats can only tell these decimals apart if they are further apart than
+    the floats themselves. The few numbers that have digits beyond that
+    precision are rounded with `decimal`, using the `rounding` mode.
+    """
+
+    def kernel(number, num_digits=0):
+        digits = numpy.trunc(num_digits) + 0 * number
+        absolute = numpy.abs(number) + 0 * digits
+        with numpy.errstate(over='ignore', invalid='ignore'):
+            truncated = numpy.floor(_shift(absolute, digits))
+            truncated += _shift(truncated + 1, -digits) <= absolute
+            truncated -= _shift(truncated, -digits) > absolute
+            rounded = _shift(rounder(truncated, absolute, digits), -digits)
+            imprecise = ~(
+                numpy.spacing(absolute) * _shift(1.0, digits + 1) < 1)
+        imprecise &= numpy.isfinite(absolute)
+        for idx in numpy.flatnonzero(imprecise).tolist():
+            rounded.flat[idx] = _round_decimal(
+                absolute.flat[idx], digits.flat[idx], rounding)
+        return numpy.copysign(rounded, number), ()
+
+    return kernel
+
+
+def _round_decimal(number, digits, rounding):
+    context = decimal.Context(prec=1000, rounding=rounding)
+    try:
+        return float(decimal.Decimal(repr(float(number))).quantize(
+            decimal.Decimal(1).scaleb(-int(digits)), context=context))
+    except decimal.InvalidOperation:
+        return number
+
+
+def _round_half_up(truncated, number, digits):
+    return truncated + (_shift(truncated + 0.5, -digits) <= number)
+
+
+def _round_up(truncated, number, digits):
+    return truncated + (_shift(truncated, -digits) < number)
+
+
+def _round_down(truncated, number, digits):
+    return truncated
+
+
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_rounding_kernel(_round_half_up, decimal.ROUND_HALF_UP))
 def ROUND(
         number: xltypes.XlNumber,
         num_digits: xltypes.XlNumber = 0,
@@ -94,6 +187,7 @@ def ROUND(
 
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_rounding_kernel(_round_up, decimal.ROUND_UP))
 def ROUNDUP(
         number: xltypes.XlNumber,
         num_digits: xltypes.XlNumber = 0
@@ -108,6 +202,7 @@ def ROUNDUP(
 
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_rounding_kernel(_round_down, decimal.ROUND_DOWN))
 def ROUNDDOWN(
         number: xltypes.XlNumber,
         num_digits: xltypes.XlNumber = 0
@@ -120,8 +215,13 @@ def ROUNDDOWN(
     return ROUND(number, num_digits=num_digits, _rounding=decimal.ROUND_DOWN)
 
 
+def _sqrt_kernel(number):
+    return numpy.sqrt(number), [(number < 0, xlerrors.NumExcelError)]
+
+
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_sqrt_kernel)
 def SQRT(
         number: xltypes.XlNumber
 ) -> xltypes.XlNumber:
@@ -136,24 +236,28 @@ def SQRT(
     return math.sqrt(number)
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
 @xl.validate_args
-def SUM(
-        *numbers: Tuple[xltypes.XlNumber]
-) -> xltypes.XlNumber:
+def SUM(*numbers) -> xltypes.XlNumber:
     """The SUM function adds values.
 
     https://support.office.com/en-us/article/
         sum-function-043e1c7d-7726-4e80-8f32-07b23e057f89
     """
+    numbers, integers = xl.collect_numbers(numbers, integers=True)
+
     # If no non numeric cells, return zero (is what excel does)
     if len(numbers) == 0:
         return 0
 
-    return sum(numbers)
+    total = utils.sum_numbers(numbers)
+    # Sums of integers are integers, as long as floats represent them.
+    if integers.all() and abs(total) <= 2 ** 53:
+        return int(total)
+    return total
 
 
-@xl.register()
+@xl.register(vectorized=True)
 @xl.validate_args
 def SUMIF(
         range: xltypes.XlArray,
@@ -165,27 +269,36 @@ def SUMIF(
     https://support.office.com/en-us/article/
         sumif-function-169b8c99-c05c-4483-a712-1697a653039b
     """
-    # WARNING:
-    # - wildcards not supported
-
-    check = xlcriteria.parse_criteria(criteria)
-
     if sum_range is None:
         sum_range = range
 
-    range = range.flat
-    sum_range = sum_range.cast_to_numbers().flat
+    if isinstance(criteria, xltypes.Array):
+        # Array criteria give an array of sums.
+        sums = xlcriteria.criteria_sums(
+            range, xlcriteria.parse_criteria_array(criteria), sum_range)
+        return xltypes.Array.from_numbers(
+            numpy.array(sums).reshape(criteria.shape))
 
-    # zip() will automatically drop any range values that have indexes larger
-    # than sum_range's length.
-    return sum([
-        sval
-        for cval, sval in zip(range, sum_range)
-        if check(cval)
-    ])
+    criterion = xlcriteria.parse_criteria(criteria)
+    return xlcriteria.criteria_sums(range, [criterion], sum_range)[0]
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
+@xl.validate_args
+def SUMIFS(
+        sum_range: xltypes.XlArray,
+        *ranges_and_criteria
+) -> xltypes.XlNumber:
+    """Adds all of its arguments that meet multiple criteria.
+
+    https://support.office.com/en-us/article/
+        sumifs-function-c9e748f5-7ea7-455d-9406-611cebce642b
+    """
+    mask = xlcriteria.criteria_mask(ranges_and_criteria, sum_range.shape)
+    return utils.sum_numbers(xl.masked_numbers(sum_range, mask))
+
+
+@xl.register(vectorized=True)
 @xl.validate_args
 def SUMPRODUCT(
         *arrays: Tuple[xltypes.XlArray]
@@ -208,16 +321,28 @@ def SUMPRODUCT(
             raise xlerrors.ValueExcelError(
                 f"The shapes of the arrays do not match. Looking "
                 f"for {array1_shape} but given array has {array_shape}")
-        if any(filter(xlerrors.ExcelError.is_error, xl.flatten(array))):
+        if array.first_error is not None:
             raise xlerrors.NaExcelError(
                 "Excel Errors are present in the sumproduct items.")
 
-    sumproduct = pandas.concat(arrays, axis=1)
-    return sumproduct.prod(axis=1).sum()
+    # Non-numeric values are treated as zeros.
+    products = numpy.prod([
+        numpy.where(
+            array.buffer.mask(xltypes.TAG_NUMBER, xltypes.TAG_DATETIME),
+            array.buffer.numbers, 0.0)
+        for array in arrays
+    ], axis=0)
+    return utils.sum_numbers(products)
+
+
+def _trunc_kernel(number, num_digits=0):
+    scale = 10.0 ** numpy.trunc(num_digits)
+    return numpy.trunc(number * scale) / scale, ()
 
 
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_trunc_kernel)
 def TRUNC(
         number: xltypes.XlNumber,
         num_digits: xltypes.XlNumber = 0
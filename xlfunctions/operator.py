@@ -1,20 +1,272 @@
-from . import xl, xlerrors, xltypes
+import datetime
+import functools
+import numpy
+
+from . import utils, xl, xlerrors, xltypes
+
+
+# Converters of common operand types to their native number. These are used
+# by the specialized kernels below to bypass argument validation.
+def _native_number(value):
+    return value
+
+
+def _wrapped_number(value):
+    return value.value
+
+
+def _blank_number(value):
+    return 0.0
+
+
+def _text_number(value):
+    return xltypes.Number.cast(value).value
+
+
+def _datetime_number(value):
+    return utils.datetime_to_number(value)
+
+
+def _wrapped_datetime_number(value):
+    return utils.datetime_to_number(value.value)
+
+
+_NUMBER_OPERANDS = {
+    int: _native_number,
+    float: _native_number,
+    numpy.int64: _native_number,
+    numpy.float64: _native_number,
+    xltypes.Number: _wrapped_number,
+}
+_BLANK_OPERANDS = {
+    type(None): _blank_number,
+    xltypes.Blank: _blank_number,
+}
+_TEXT_OPERANDS = {
+    str: _text_number,
+    xltypes.Text: _text_number,
+}
+_DATETIME_OPERANDS = {
+    datetime.datetime: _datetime_number,
+    xltypes.DateTime: _wrapped_datetime_number,
+}
+
+
+def _operand_pairs():
+    """Yield the specialized operand type pairs with their converters.
+
+    These are number/number, number/blank, text/number and datetime/number
+    (in any order).
+    """
+    for others in (
+            _NUMBER_OPERANDS, _BLANK_OPERANDS, _TEXT_OPERANDS,
+            _DATETIME_OPERANDS
+    ):
+        for ltype, lconvert in _NUMBER_OPERANDS.items():
+            for rtype, rconvert in others.items():
+                yield (ltype, rtype), lconvert, rconvert
+                yield (rtype, ltype), rconvert, lconvert
+
+
+def _arithmetic_table(op):
+    table = {}
+    for types, lconvert, rconvert in _operand_pairs():
+
+        def kernel(left, right, lconvert=lconvert, rconvert=rconvert):
+            try:
+                return xltypes.Number(op(lconvert(left), rconvert(right)))
+            except xlerrors.ExcelError as err:
+                return err
+
+        table[types] = kernel
+    return table
+
+
+def _divide(left, right):
+    if right == 0:
+        raise xlerrors.DivZeroExcelError()
+    return float(left) / float(right)
+
+
+def _comparison_table(op):
+    table = {}
+    for types, lconvert, rconvert in _operand_pairs():
+        lblank = types[0] in _BLANK_OPERANDS
+        rblank = types[1] in _BLANK_OPERANDS
+        # Text sorts after numbers (and date/times).
+        ltext = types[0] in _TEXT_OPERANDS
+        rtext = types[1] in _TEXT_OPERANDS
+
+        if lblank or rblank:
+            def kernel(left, right):
+                return xltypes.FALSE
+        elif ltext or rtext:
+            def kernel(left, right, result=op(ltext, rtext)):
+                return xltypes.Boolean(result)
+        else:
+            def kernel(left, right, lconvert=lconvert, rconvert=rconvert):
+                if op(lconvert(left), rconvert(right)):
+                    return xltypes.TRUE
+                return xltypes.FALSE
+
+        table[types] = kernel
+    return table
+
+
+def _specialize(table):
+    """Decorator to dispatch binary operators to specialized kernels.
+
+    The kernel is selected by the types of both operands. Operands of other
+    types are handled by the decorated function.
+    """
+
+    def decorate(func):
+
+        @functools.wraps(func)
+        def specialized(left, right):
+            kernel = table.get((type(left), type(right)))
+            if kernel is None:
+                return func(left, right)
+            return kernel(left, right)
+
+        return specialized
+
+    return decorate
+
+
+def _mul_kernel(left, right):
+    return left * right, ()
+
+
+def _div_kernel(left, right):
+    return left / right, [(right == 0, xlerrors.DivZeroExcelError)]
+
+
+def _add_kernel(left, right):
+    return left + right, ()
+
+
+def _sub_kernel(left, right):
+    return left - right, ()
+
+
+def _neg_kernel(right):
+    return -right, ()
+
+
+def _percent_kernel(left):
+    return left * 0.01, ()
+
+
+_ERROR_INDEX_VALUE = xlerrors.ERROR_CODES.index(xlerrors.ERROR_CODE_VALUE)
+_ERROR_INDEX_NA = xlerrors.ERROR_CODES.index(xlerrors.ERROR_CODE_NA)
+
+# Excel sorts numbers (and date/times) before text before booleans. Blanks
+# take the type of the value they are compared to.
+_PRECEDENCE = numpy.zeros(xltypes.TAG_OTHER + 1, dtype=numpy.int8)
+_PRECEDENCE[xltypes.TAG_TEXT] = 1
+_PRECEDENCE[xltypes.TAG_BOOLEAN] = 2
+
+
+def _comparison_operand(value, shape):
+    """Return the tags, numbers, lower case texts and error indexes of an
+    operand, broadcast to the shape."""
+    if not isinstance(value, xltypes.Array):
+        value = xltypes.Array([[value]])
+    buffer = value.buffer
+    if not buffer.size:
+        return (
+            numpy.full(shape, xltypes.TAG_ERROR, dtype=numpy.int8),
+            numpy.zeros(shape),
+            numpy.full(shape, '', dtype=object),
+            numpy.full(shape, _ERROR_INDEX_NA, dtype=numpy.int8)
+        )
+
+    tags = buffer.tags
+    codes = numpy.full(buffer.size, -1, dtype=numpy.int8)
+    if buffer.errors is not None:
+        is_error = tags == xltypes.TAG_ERROR
+        codes[is_error] = buffer.errors[is_error]
+    codes[tags == xltypes.TAG_OTHER] = _ERROR_INDEX_VALUE
+    texts = numpy.full(buffer.size, '', dtype=object)
+    is_text = tags == xltypes.TAG_TEXT
+    if is_text.any():
+        # Excel compares text case-insensitively.
+        texts[is_text] = [text.lower() for text in buffer.texts[is_text]]
+
+    index, outside = xl.broadcast_index(buffer.shape, shape)
+    codes = codes.reshape(buffer.shape)[index]
+    codes[outside] = _ERROR_INDEX_NA
+    return (
+        tags.reshape(buffer.shape)[index],
+        buffer.numbers.reshape(buffer.shape)[index],
+        texts.reshape(buffer.shape)[index],
+        codes
+    )
+
+
+def _compare_arrays(left, right):
+    """Compare the cells of arrays using Excel's ordering.
+
+    Returns the sign of the comparison (-1, 0 or 1) and the error indexes
+    (-1 if none) of all cells.
+    """
+    shape = xl.broadcast_shape((left, right))
+    ltags, lnumbers, ltexts, lcodes = _comparison_operand(left, shape)
+    rtags, rnumbers, rtexts, rcodes = _comparison_operand(right, shape)
+    codes = numpy.where(lcodes < 0, rcodes, lcodes)
+
+    lblank = ltags == xltypes.TAG_BLANK
+    rblank = rtags == xltypes.TAG_BLANK
+    lprecedence = _PRECEDENCE[ltags]
+    rprecedence = _PRECEDENCE[rtags]
+    # A blank compares like 0, "" or FALSE (all of which are stored as 0.0
+    # and "" in the operands).
+    lprecedence = numpy.where(lblank, rprecedence, lprecedence)
+    rprecedence = numpy.where(rblank, lprecedence, rprecedence)
+
+    sign = numpy.sign(lprecedence - rprecedence).astype(numpy.int8)
+    same = lprecedence == rprecedence
+    sign[same] = numpy.sign(lnumbers - rnumbers)[same]
+    texts = same & (lprecedence == 1)
+    if texts.any():
+        ltexts = ltexts[texts]
+        rtexts = rtexts[texts]
+        sign[texts] = (
+            (ltexts > rtexts).astype(numpy.int8)
+            - (ltexts < rtexts).astype(numpy.int8)
+        )
+    return sign, codes
+
+
+def _compare(left, right, test):
+    sign, codes = _compare_arrays(left, right)
+    return xl.result_array(test(sign), codes, xltypes.TAG_BOOLEAN)
+
+
+def _is_array(left, right):
+    return (
+        isinstance(left, xltypes.Array) or isinstance(right, xltypes.Array))
 
 
 @xl.register()
+@_specialize(_arithmetic_table(lambda left, right: left * right))
 @xl.validate_args
+@xl.elementwise(_mul_kernel)
 def OP_MUL(
-        left: xltypes.XlAnything,
-        right: xltypes.XlAnything
+        left: xltypes.XlNumber,
+        right: xltypes.XlNumber
 ) -> xltypes.XlNumber:
     return left * right
 
 
 @xl.register()
+@_specialize(_arithmetic_table(_divide))
 @xl.validate_args
+@xl.elementwise(_div_kernel)
 def OP_DIV(
-        left: xltypes.XlAnything,
-        right: xltypes.XlAnything
+        left: xltypes.XlNumber,
+        right: xltypes.XlNumber
 ) -> xltypes.XlNumber:
     if right == 0:
         raise xlerrors.DivZeroExcelError()
@@ -22,78 +274,116 @@ def OP_DIV(
 
 
 @xl.register()
+@_specialize(_arithmetic_table(lambda left, right: left + right))
 @xl.validate_args
+@xl.elementwise(_add_kernel)
 def OP_ADD(
-        left: xltypes.XlAnything,
-        right: xltypes.XlAnything
+        left: xltypes.XlNumber,
+        right: xltypes.XlNumber
 ) -> xltypes.XlNumber:
     return left + right
 
 
 @xl.register()
+@_specialize(_arithmetic_table(lambda left, right: left - right))
 @xl.validate_args
+@xl.elementwise(_sub_kernel)
 def OP_SUB(
-        left: xltypes.XlAnything,
-        right: xltypes.XlAnything
+        left: xltypes.XlNumber,
+        right: xltypes.XlNumber
 ) -> xltypes.XlNumber:
     return left - right
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
 def OP_EQ(
         left: xltypes.XlAnything,
         right: xltypes.XlAnything
 ) -> xltypes.XlBoolean:
+    if _is_array(left, right):
+        return _compare(left, right, lambda sign: sign == 0)
     return left == right
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
 def OP_NE(
         left: xltypes.XlAnything,
         right: xltypes.XlAnything
 ) -> xltypes.XlBoolean:
+    if _is_array(left, right):
+        return _compare(left, right, lambda sign: sign != 0)
     return left != right
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
+@_specialize(_comparison_table(lambda left, right: left > right))
 @xl.validate_args
 def OP_GT(
         left: xltypes.XlAnything,
         right: xltypes.XlAnything
 ) -> xltypes.XlBoolean:
+    """Returns whether `left` is greater than `right`.
+
+    Blanks are handled like by `OP_LT()`.
+    """
+    if _is_array(left, right):
+        return _compare(left, right, lambda sign: sign > 0)
     if isinstance(left, xltypes.Blank) or isinstance(right, xltypes.Blank):
         return False
     return left > right
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
+@_specialize(_comparison_table(lambda left, right: left < right))
 @xl.validate_args
 def OP_LT(
         left: xltypes.XlAnything,
         right: xltypes.XlAnything
 ) -> xltypes.XlBoolean:
+    """Returns whether `left` is less than `right`.
+
+    Cells of arrays are compared with Excel's ordering, in which a blank
+    compares like 0, "" or FALSE. Note that a blank operand that is not an
+    array makes the result FALSE instead, as it always has.
+    """
+    if _is_array(left, right):
+        return _compare(left, right, lambda sign: sign < 0)
     if isinstance(left, xltypes.Blank) or isinstance(right, xltypes.Blank):
         return False
     return left < right
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
+@_specialize(_comparison_table(lambda left, right: left >= right))
 @xl.validate_args
 def OP_GE(
         left: xltypes.XlAnything,
         right: xltypes.XlAnything
 ) -> xltypes.XlBoolean:
+    """Returns whether `left` is greater than or equal to `right`.
+
+    Blanks are handled like by `OP_LT()`.
+    """
+    if _is_array(left, right):
+        return _compare(left, right, lambda sign: sign >= 0)
     if isinstance(left, xltypes.Blank) or isinstance(right, xltypes.Blank):
         return False
     return left >= right
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
+@_specialize(_comparison_table(lambda left, right: left <= right))
 @xl.validate_args
 def OP_LE(
         left: xltypes.XlAnything,
         right: xltypes.XlAnything
 ) -> xltypes.XlBoolean:
+    """Returns whether `left` is less than or equal to `right`.
+
+    Blanks are handled like by `OP_LT()`.
+    """
+    if _is_array(left, right):
+        return _compare(left, right, lambda sign: sign <= 0)
     if isinstance(left, xltypes.Blank) or isinstance(right, xltypes.Blank):
         return False
     return left <= right
@@ -101,6 +391,7 @@ def OP_LE(
 
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_neg_kernel)
 def OP_NEG(
         right: xltypes.XlNumber
 ) -> xltypes.XlNumber:
@@ -109,6 +400,7 @@ def OP_NEG(
 
 @xl.register()
 @xl.validate_args
+@xl.elementwise(_percent_kernel)
 def OP_PERCENT(
         left: xltypes.XlNumber
 ) -> xltypes.XlNumber:
@@ -1,28 +1,45 @@
-from typing import Tuple
+import numpy
 
-from . import xl, xlerrors, xltypes
+from . import utils, xl, xlcriteria, xlerrors, xltypes
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
 @xl.validate_args
-def AVERAGE(
-        *numbers: Tuple[xltypes.Number]
-) -> xltypes.Number:
+def AVERAGE(*numbers) -> xltypes.Number:
     """Returns the average (arithmetic mean) of the arguments.
 
     https://support.office.com/en-us/article/
         average-function-047bac88-d466-426c-a32b-8f33eb960cf6
     """
-    numbers = xl.flatten(numbers)
+    numbers = xl.collect_numbers(numbers)
 
     # If no non numeric cells, return zero (is what excel does)
     if len(numbers) < 1:
         return 0
 
-    return sum(numbers) / len(numbers)
+    return utils.sum_numbers(numbers) / len(numbers)
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
+@xl.validate_args
+def AVERAGEIFS(
+        average_range: xltypes.XlArray,
+        *ranges_and_criteria
+) -> xltypes.XlNumber:
+    """Returns the average (arithmetic mean) of all cells that meet multiple
+    criteria.
+
+    https://support.office.com/en-us/article/
+        averageifs-function-48910c45-1fc0-4389-a028-f7c5c3001690
+    """
+    mask = xlcriteria.criteria_mask(ranges_and_criteria, average_range.shape)
+    numbers = xl.masked_numbers(average_range, mask)
+    if not numbers.size:
+        raise xlerrors.DivZeroExcelError('No cells meet the criteria.')
+    return utils.sum_numbers(numbers) / numbers.size
+
+
+@xl.register(array_aware=True, vectorized=True)
 @xl.validate_args
 def COUNT(*values) -> xltypes.Number:
     """Counts the number of cells that contain numbers, and counts numbers
@@ -31,19 +48,19 @@ def COUNT(*values) -> xltypes.Number:
     https://support.office.com/en-us/article/
         count-function-a59cd7fc-b623-4d93-87a4-d23bf411294c
     """
-    values = xl.flatten(values)
     if not len(values) or values[0] is None:
         raise xlerrors.ValueExcelError('value1 is required')
 
-    if len(values) > 255:
+    arrays, direct = xl.split_arrays(values)
+    if len(arrays) + len(direct) > 255:
         raise xlerrors.ValueExcelError(
             f"Can only have up to 255 supplimentary arguments. "
-            f"Provided: {len(values)}")
+            f"Provided: {len(arrays) + len(direct)}")
 
-    return len(list(filter(xltypes.Number.is_type, values)))
+    return len(xl.collect_numbers(values))
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
 @xl.validate_args
 def COUNTA(*values):
     """Counts the number of cells that are not empty in a range.
@@ -51,43 +68,137 @@ def COUNTA(*values):
     https://support.office.com/en-us/article/
         counta-function-7dc98875-d5c1-46f1-9a82-53f3219e2509
     """
-    values = xl.flatten(values)
     if not len(values) or values[0] is None:
         raise xlerrors.NullExcelError('value1 is required')
 
-    if len(values) > 255:
+    arrays, direct = xl.split_arrays(values)
+    if len(arrays) + len(direct) > 255:
         raise xlerrors.ValueExcelError(
             f"Can only have up to 255 supplimentary arguments. "
-            f"Provided: {len(values)}")
+            f"Provided: {len(arrays) + len(direct)}")
+
+    count = len(list(filter(lambda x: not xltypes.Blank.is_blank(x), direct)))
+    for array in arrays:
+        buffer = array.buffer
+        count += int((~buffer.mask(xltypes.TAG_BLANK)).sum())
+        # Empty texts are considered blank as well.
+        if buffer.texts is not None:
+            count -= int((buffer.texts == '').sum())
+    return count
+
+
+@xl.register(vectorized=True)
+@xl.validate_args
+def COUNTIF(
+        range: xltypes.XlArray,
+        criteria: xltypes.XlAnything
+) -> xltypes.XlNumber:
+    """Counts the number of cells that meet a criterion.
 
-    return len(list(filter(lambda x: not xltypes.Blank.is_blank(x), values)))
+    https://support.office.com/en-us/article/
+        countif-function-e0de10c6-f885-4e71-abb4-1f464816df34
+    """
+    if isinstance(criteria, xltypes.Array):
+        # Array criteria give an array of counts.
+        counts = xlcriteria.criteria_counts(
+            range, xlcriteria.parse_criteria_array(criteria))
+        return xltypes.Array.from_numbers(
+            numpy.array(counts).reshape(criteria.shape))
+
+    criterion = xlcriteria.parse_criteria(criteria)
+    return xlcriteria.criteria_counts(range, [criterion])[0]
+
+
+@xl.register(array_aware=True, vectorized=True)
+@xl.validate_args
+def COUNTIFS(*ranges_and_criteria) -> xltypes.XlNumber:
+    """Counts the number of cells that meet multiple criteria.
 
+    https://support.office.com/en-us/article/
+        countifs-function-dda3dc6e-f74e-4aee-88bc-aa8c2a866842
+    """
+    return int(xlcriteria.criteria_mask(ranges_and_criteria).sum())
 
-@xl.register()
+
+@xl.register(array_aware=True, vectorized=True)
 @xl.validate_args
-def MAX(*numbers: Tuple[xltypes.Number]):
+def MAX(*numbers):
     """Returns the largest value in a set of values.
 
     https://support.office.com/en-us/article/
         max-function-e0012414-9ac8-4b34-9a47-73e662c08098
     """
+    numbers, integers = xl.collect_numbers(numbers, integers=True)
+
     # If no non numeric cells, return zero (is what excel does)
     if len(numbers) < 1:
         return 0
 
-    return max(filter(xltypes.Number.is_type, numbers))
+    # Like Python's max(), return the first maximum with its type.
+    idx = numbers.argmax()
+    if integers[idx]:
+        return int(numbers[idx])
+    return float(numbers[idx])
 
 
-@xl.register()
+@xl.register(array_aware=True, vectorized=True)
 @xl.validate_args
-def MIN(*numbers: Tuple[xltypes.Number]):
+def MAXIFS(
+        max_range: xltypes.XlArray,
+        *ranges_and_criteria
+) -> xltypes.XlNumber:
+    """Returns the maximum value among cells that meet multiple criteria.
+
+    https://support.office.com/en-us/article/
+        maxifs-function-dfd611e6-da2c-488a-919b-9b6376b28883
+    """
+    mask = xlcriteria.criteria_mask(ranges_and_criteria, max_range.shape)
+    numbers = xl.masked_numbers(max_range, mask)
+
+    # If no cells meet the criteria, return zero (is what excel does)
+    if not numbers.size:
+        return 0
+
+    return float(numbers.max())
+
+
+@xl.register(array_aware=True, vectorized=True)
+@xl.validate_args
+def MIN(*numbers):
     """Returns the smallest number in a set of values.
 
     https://support.office.com/en-us/article/
         min-function-61635d12-920f-4ce2-a70f-96f202dcc152
     """
+    numbers, integers = xl.collect_numbers(numbers, integers=True)
+
     # If no non numeric cells, return zero (is what excel does)
     if len(numbers) < 1:
         return 0
 
-    return min(filter(xltypes.Number.is_type, numbers))
+    # Like Python's min(), return the first minimum with its type.
+    idx = numbers.argmin()
+    if integers[idx]:
+        return int(numbers[idx])
+    return float(numbers[idx])
+
+
+@xl.register(array_aware=True, vectorized=True)
+@xl.validate_args
+def MINIFS(
+        min_range: xltypes.XlArray,
+        *ranges_and_criteria
+) -> xltypes.XlNumber:
+    """Returns the minimum value among cells that meet multiple criteria.
+
+    https://support.office.com/en-us/article/
+        minifs-function-6ca1ddaa-079b-4e74-80cc-72eef32e6599
+    """
+    mask = xlcriteria.criteria_mask(ranges_and_criteria, min_range.shape)
+    numbers = xl.masked_numbers(min_range, mask)
+
+    # If no cells meet the criteria, return zero (is what excel does)
+    if not numbers.size:
+        return 0
+
+    return float(numbers.min())
@@ -18,7 +18,6 @@ def CONCAT(
         raise xlerrors.ValueExcelError(
             f"Can't concat more than 254 arguments. Provided: {len(texts)}")
 
-    texts = xl.flatten(texts)
     return ''.join([
         str(text) for text in xl.flatten(texts)
     ])
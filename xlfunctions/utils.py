@@ -1,7 +1,16 @@
 import datetime
+import math
+import numpy
 
 EXCEL_EPOCH = datetime.datetime(1900, 1, 1)
 
+# When true, `sum_numbers()` uses compensated (Neumaier) summation; otherwise
+# numpy's pairwise summation is used.
+COMPENSATED_SUMMATION = True
+
+# Below this size, compensated summation is done in a simple loop.
+_SUM_LANES_THRESHOLD = 1024
+
 
 def number_to_datetime(value):
     offset = 2 if value > 58 else 1
@@ -15,3 +24,53 @@ def datetime_to_number(value):
     # Excel treats 1900 as a leap year.
     offset = 2 if delta.days > 58 else 1
     return (delta.days + offset) + (delta.seconds / 24*60*60)
+
+
+def _neumaier(values):
+    total = 0.0
+    compensation = 0.0
+    for value in values:
+        tmp = total + value
+        if abs(total) >= abs(value):
+            compensation += (total - tmp) + value
+        else:
+            compensation += (value - tmp) + total
+        total = tmp
+    return total + compensation
+
+
+def _neumaier_lanes(values):
+    # Run the Neumaier algorithm on many lanes at once, so that every step is
+    # a numpy operation, and then combine the lane results.
+    lanes = int(math.sqrt(values.size))
+    steps = -(-values.size // lanes)
+    padded = numpy.zeros(lanes * steps)
+    padded[:values.size] = values
+    total = numpy.zeros(lanes)
+    compensation = numpy.zeros(lanes)
+    for row in padded.reshape(steps, lanes):
+        tmp = total + row
+        compensation += numpy.where(
+            numpy.abs(total) >= numpy.abs(row),
+            (total - tmp) + row,
+            (row - tmp) + total)
+        total = tmp
+    return _neumaier(total.tolist() + compensation.tolist())
+
+
+def sum_numbers(values, compensated=None):
+    """Sum numbers using native floats.
+
+    `values` can be any sequence of numbers or a numpy array. Unless
+    `compensated` (defaults to `COMPENSATED_SUMMATION`) is false,
+    compensated (Neumaier) summation is used to minimize the rounding error
+    on long sequences.
+    """
+    values = numpy.asarray(values, dtype=numpy.float64).ravel()
+    if compensated is None:
+        compensated = COMPENSATED_SUMMATION
+    if not compensated:
+        return float(values.sum())
+    if values.size < _SUM_LANES_THRESHOLD:
+        return _neumaier(values.tolist())
+    return _neumaier_lanes(values)
@@ -1,5 +1,7 @@
+import collections
 import functools
 import inspect
+import numpy
 import typing
 
 from . import xltypes, xlerrors
@@ -18,12 +20,116 @@ TYPE_TO_CAST = {
 }
 
 
+# Rough cost classes of functions.
+COST_CHEAP = 'cheap'
+COST_LINEAR = 'linear'  # proportional to the size of the arguments
+COST_EXPENSIVE = 'expensive'
+
+
+def _is_array_annotation(vtype):
+    # `XlAnything` is deliberately not considered array aware.
+    return (
+        vtype in (xltypes.XlArray, xltypes.Array)
+        or getattr(vtype, '__origin__', None) in (list, tuple)
+    )
+
+
+def _is_expr_annotation(vtype):
+    if vtype == xltypes.XlExpr:
+        return True
+    return (
+        getattr(vtype, '__origin__', None) in (list, tuple)
+        and _is_expr_annotation(vtype.__args__[0])
+    )
+
+
+class FunctionInfo:
+    """Metadata about a registered function.
+
+    `volatile`
+        The result may change between calls with the same arguments (e.g.
+        `TODAY()`). Non-volatile functions are pure.
+
+    `lazy`
+        Names of the parameters that receive unevaluated expressions, so
+        that the function can short-circuit (e.g. `IF()`).
+
+    `array_aware`
+        The function accepts arrays (ranges) for at least one parameter.
+        Otherwise it is scalar-only.
+
+    `vectorized`
+        A vectorized kernel is used for array arguments.
+
+    `cost`
+        One of `COST_CHEAP`, `COST_LINEAR` and `COST_EXPENSIVE`.
+
+    Unless specified explicitly, the lazy parameters and whether a function
+    is array aware are derived from the type annotations, and functions with
+    an `elementwise()` kernel are vectorized.
+    """
+
+    def __init__(
+            self, name, func, volatile=False, lazy=None, array_aware=None,
+            vectorized=None, cost=None
+    ):
+        params = inspect.signature(func).parameters.values()
+        if vectorized is None:
+            vectorized = getattr(func, 'elementwise', None) is not None
+        if lazy is None:
+            lazy = tuple(
+                param.name for param in params
+                if _is_expr_annotation(param.annotation)
+            )
+        if array_aware is None:
+            array_aware = vectorized or any(
+                _is_array_annotation(param.annotation) for param in params)
+        if cost is None:
+            cost = COST_LINEAR if array_aware else COST_CHEAP
+
+        self.name = name
+        self.volatile = volatile
+        self.lazy = tuple(lazy)
+        self.array_aware = array_aware
+        self.vectorized = vectorized
+        self.cost = cost
+
+    @property
+    def pure(self):
+        return not self.volatile
+
+    def __repr__(self):
+        return (
+            f'<FunctionInfo {self.name} volatile={self.volatile} '
+            f'lazy={self.lazy} array_aware={self.array_aware} '
+            f'vectorized={self.vectorized} cost={self.cost}>'
+        )
+
+
 class Functions(dict):
 
-    def register(self, func, name=None):
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.info = {}
+
+    def register(self, func, name=None, **metadata):
         if name is None:
             name = func.__name__
         self[name] = func
+        self.info[name] = FunctionInfo(name, func, **metadata)
+
+    def select(self, **metadata):
+        """Return the names of all functions with the given metadata.
+
+        For example `FUNCTIONS.select(volatile=True)`.
+        """
+        return [
+            name for name, info in self.info.items()
+            if all(
+                getattr(info, attr) == value
+                for attr, value in metadata.items()
+            )
+        ]
 
     def __getattr__(self, name):
         try:
@@ -35,41 +141,201 @@ class Functions(dict):
 FUNCTIONS = Functions()
 
 
-def register(name=None):
-    """Decorator to register a function."""
+class _Uncacheable(Exception):
+    pass
+
+
+def _cache_key(value):
+    # Native values produce the same key as the Excel type they represent.
+    if isinstance(value, xltypes.ExcelType):
+        return (value.__class__, type(value.value), value.value)
+    if isinstance(value, xltypes.Array):
+        if not value.frozen:
+            raise _Uncacheable()
+        return (xltypes.Array, value.shape, value.fingerprint)
+    if isinstance(value, (list, tuple)):
+        return (tuple, tuple(_cache_key(item) for item in value))
+    if isinstance(value, xlerrors.ExcelError):
+        return (value.__class__, value.value)
+    if isinstance(value, xltypes.Expr):
+        # Expressions are evaluated lazily and may not be pure.
+        raise _Uncacheable()
+    vtype = type(value)
+    xltype = xltypes.NATIVE_TO_XLTYPE.get(vtype, vtype)
+    try:
+        hash(value)
+    except TypeError:
+        raise _Uncacheable()
+    return (xltype, vtype, value)
+
+
+class LRUCache:
+    """Bounded cache discarding the least recently used entries.
+
+    A `maxsize` of zero disables the cache.
+    """
+
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def resize(self, maxsize):
+        """Change the maximum size, evicting the oldest entries if needed."""
+        self.maxsize = maxsize
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, create):
+        """Return the entry for the key, calling `create()` to create it if
+        it is missing."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = create()
+        self._entries[key] = value
+        self._evict()
+        return value
+
+
+class FunctionCache(LRUCache):
+    """LRU cache of function results.
+
+    A `maxsize` of zero disables the cache.
+    """
+
+    def call(self, func, args, kw):
+        """Call the function, or return its cached result."""
+        try:
+            # Results may depend on the compatibility mode.
+            key = (
+                func, COMPATIBILITY,
+                _cache_key(args), _cache_key(tuple(sorted(kw.items())))
+            )
+        except _Uncacheable:
+            return func(*args, **kw)
+        return self.get(key, lambda: func(*args, **kw))
+
+
+# Results of all registered, non-volatile functions. Disabled by default; use
+# `FUNCTION_CACHE.resize()` to enable it.
+FUNCTION_CACHE = FunctionCache()
+
+
+def _memoized(func):
+
+    @functools.wraps(func)
+    def memoized(*args, **kw):
+        if not FUNCTION_CACHE.maxsize:
+            return func(*args, **kw)
+        return FUNCTION_CACHE.call(func, args, kw)
+
+    return memoized
+
+
+def register(name=None, **metadata):
+    """Decorator to register a function.
+
+    Any keyword arguments are stored as metadata of the function (see
+    `FunctionInfo`).
+
+    Results of pure functions (i.e. functions that always return the same
+    result for the same arguments) are cached in `FUNCTION_CACHE`.
+    """
 
     def registerFunction(func):
-        FUNCTIONS.register(func, name)
+        if not metadata.get('volatile', False):
+            func = _memoized(func)
+        FUNCTIONS.register(func, name, **metadata)
         return func
 
     return registerFunction
 
 
-def _validate(vtype, val, name):
+def _identity(val):
+    return val
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_cast(vtype):
+    """Compile a type annotation into a single casting callable.
+
+    The result is cached per annotation, so that the (comparatively
+    expensive) inspection of typing constructs only happens once.
+    """
     cast = TYPE_TO_CAST.get(vtype, None)
     if cast is not None:
-        return cast(val)
+        return cast
 
     # Support lists with value types
     if getattr(vtype, '__origin__', None) in [list, tuple]:
         itype = vtype.__args__[0]
-        if itype != xltypes.XlArray:
-            val = flatten(val)
-        return tuple(filter(
-            lambda x: x is not None,
-            [_safe_validate(itype, item, name) for item in val]
-        ))
+        icast = _compile_cast(itype)
+        do_flatten = itype != xltypes.XlArray
+
+        def cast_items(val):
+            if do_flatten:
+                val = flatten(val)
+            items = []
+            for item in val:
+                try:
+                    item = icast(item)
+                except xlerrors.ExcelError:
+                    continue
+                if item is not None:
+                    items.append(item)
+            return tuple(items)
+
+        return cast_items
 
     # Support unions
     if getattr(vtype, '__origin__', None) == typing.Union:
-        for stype in vtype.__args__:
-            try:
-                return _validate(stype, val, name)
-            except xlerrors.ExcelError:
-                pass
-        raise xlerrors.ValueExcelError(val)
+        scasts = tuple(_compile_cast(stype) for stype in vtype.__args__)
+
+        def cast_union(val):
+            for scast in scasts:
+                try:
+                    return scast(val)
+                except xlerrors.ExcelError:
+                    pass
+            raise xlerrors.ValueExcelError(val)
+
+        return cast_union
+
+    return _identity
 
-    return val
+
+def _validate(vtype, val, name):
+    return _compile_cast(vtype)(val)
 
 
 def _safe_validate(vtype, val, name):
@@ -79,30 +345,221 @@ def _safe_validate(vtype, val, name):
         return None
 
 
+def _compile_plan(sig):
+    """Build the validation plan for a function signature.
+
+    Returns the casts of all positional parameters (in order), the cast of
+    the variable positional parameter (or `None`), the casts of all
+    parameters by name and the cast of the return value. Defaults are not
+    cast, so they are left for Python to fill in.
+    """
+    positional = []
+    varargs = None
+    by_name = {}
+    for param in sig.parameters.values():
+        cast = _compile_cast(param.annotation)
+        by_name[param.name] = cast
+        if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+            positional.append(cast)
+        elif param.kind == param.VAR_POSITIONAL:
+            varargs = cast
+    return (
+        tuple(positional), varargs, by_name,
+        _compile_cast(sig.return_annotation)
+    )
+
+
+_ERROR_INDEX_VALUE = xlerrors.ERROR_CODES.index(xlerrors.ERROR_CODE_VALUE)
+_ERROR_INDEX_NUM = xlerrors.ERROR_CODES.index(xlerrors.ERROR_CODE_NUM)
+_ERROR_INDEX_NA = xlerrors.ERROR_CODES.index(xlerrors.ERROR_CODE_NA)
+
+
+def elementwise(kernel):
+    """Decorator to evaluate a function elementwise when given arrays.
+
+    When an `Array` is passed for any `XlNumber` parameter, `validate_args()`
+    calls `kernel` instead of the function, with the values of all `XlNumber`
+    parameters (in order) as float64 ndarrays that broadcast to the shape of
+    the result. The kernel returns the results and an iterable of
+    `(mask, error class)` pairs for the cells that are errors. Other results
+    that are not finite are #NUM! errors.
+
+    The result is an `Array`. Cells are an error if the corresponding cell
+    of an argument is an error or text that is not a number; and #N/A if
+    they are outside of the shape of an argument (unless it has a single
+    row/column).
+    """
+
+    def decorate(func):
+        func.elementwise = kernel
+        return func
+
+    return decorate
+
+
+def broadcast_shape(values):
+    """Return the shape of the result of broadcasting arrays like Excel.
+
+    Values that are not arrays are ignored.
+    """
+    shapes = [
+        value.shape for value in values if isinstance(value, xltypes.Array)]
+    return (
+        max(rows for rows, _ in shapes), max(cols for _, cols in shapes))
+
+
+def broadcast_index(from_shape, shape):
+    """Index to broadcast a 2-D ndarray of `from_shape` to `shape`.
+
+    Single rows/columns are repeated. Returns the index and a mask of the
+    cells outside of `from_shape` (which are #N/A in Excel). `from_shape`
+    must not be empty.
+    """
+    nrows, ncols = shape
+    rows, cols = from_shape
+    ridx = numpy.zeros(nrows, dtype=int) if rows == 1 else numpy.arange(nrows)
+    cidx = numpy.zeros(ncols, dtype=int) if cols == 1 else numpy.arange(ncols)
+    outside = (ridx >= rows)[:, None] | (cidx >= cols)[None, :]
+    index = numpy.ix_(
+        numpy.minimum(ridx, rows - 1), numpy.minimum(cidx, cols - 1))
+    return index, outside
+
+
+def _broadcast_operand(value, shape):
+    """Return the numbers and error indexes (-1 if none) of an argument,
+    broadcast to the shape."""
+    if not isinstance(value, xltypes.Array):
+        return numpy.float64(xltypes.Number.cast(value).value), None
+
+    buffer = value.buffer
+    if not buffer.size:
+        return (
+            numpy.zeros(shape),
+            numpy.full(shape, _ERROR_INDEX_NA, dtype=numpy.int8)
+        )
+
+    tags = buffer.tags
+    numbers = buffer.numbers
+    codes = numpy.full(buffer.size, -1, dtype=numpy.int8)
+    if buffer.errors is not None:
+        is_error = tags == xltypes.TAG_ERROR
+        codes[is_error] = buffer.errors[is_error]
+    codes[tags == xltypes.TAG_OTHER] = _ERROR_INDEX_VALUE
+    texts = numpy.flatnonzero(tags == xltypes.TAG_TEXT)
+    if texts.size:
+        numbers = numbers.copy()
+        for idx in texts.tolist():
+            try:
+                numbers[idx] = xltypes.Number.cast(
+                    xltypes.Text(buffer.texts[idx])).value
+            except xlerrors.ExcelError:
+                codes[idx] = _ERROR_INDEX_VALUE
+
+    index, outside = broadcast_index(buffer.shape, shape)
+    numbers = numbers.reshape(buffer.shape)[index]
+    codes = codes.reshape(buffer.shape)[index]
+    codes[outside] = _ERROR_INDEX_NA
+    return numbers, codes
+
+
+def _apply_elementwise(kernel, values):
+    shape = broadcast_shape(values)
+
+    numbers = []
+    codes = numpy.full(shape, -1, dtype=numpy.int8)
+    for value in values:
+        operand, operand_codes = _broadcast_operand(value, shape)
+        numbers.append(operand)
+        if operand_codes is not None:
+            # The error of the first argument wins.
+            codes = numpy.where(codes < 0, operand_codes, codes)
+
+    with numpy.errstate(all='ignore'):
+        result, errors = kernel(*numbers)
+    result = numpy.array(
+        numpy.broadcast_to(result, shape), dtype=numpy.float64)
+    for mask, error in errors:
+        mask = numpy.broadcast_to(mask, shape) & (codes < 0)
+        codes[mask] = xlerrors.ERROR_CODES.index(error.value)
+    codes[(codes < 0) & ~numpy.isfinite(result)] = _ERROR_INDEX_NUM
+    return result_array(result, codes)
+
+
+def result_array(results, codes, tag=xltypes.TAG_NUMBER):
+    """Create an array from 2-D ndarrays of results and error indexes.
+
+    Cells with an error index of -1 are results of the given type tag (the
+    results must be their float64 representation); all others are errors.
+    """
+    is_error = codes >= 0
+    numbers = numpy.where(is_error, 0.0, results).astype(numpy.float64)
+    tags = numpy.where(is_error, xltypes.TAG_ERROR, tag).astype(numpy.int8)
+    errors = None
+    if is_error.any():
+        errors = numpy.where(is_error, codes, 0).astype(numpy.int8).ravel()
+    return xltypes.Array.from_buffer(xltypes.ArrayBuffer(
+        results.shape, numbers.ravel(), tags.ravel(), errors))
+
+
 def validate_args(func):
+    sig = inspect.signature(func)
+    positional, varargs, by_name, return_cast = _compile_plan(sig)
+    npositional = len(positional)
+    kernel = getattr(func, 'elementwise', None)
+    number_names = [
+        pname for pname, cast in by_name.items()
+        if cast == xltypes.Number.cast
+    ]
 
-    @functools.wraps(func)
-    def validate(*args, **kw):
-        sig = inspect.signature(func)
+    def broadcast(args, kw):
         bound = sig.bind(*args, **kw)
-        # 1. Convert all input parameters to Excel Types.
-        for pname, value in list(bound.arguments.items()):
+        bound.apply_defaults()
+        values = [bound.arguments[pname] for pname in number_names]
+        if not any(isinstance(value, xltypes.Array) for value in values):
+            return None
+        for value in values:
             if isinstance(value, xlerrors.ExcelError):
                 return value
-            try:
-                bound.arguments[pname] = _validate(
-                    sig.parameters[pname].annotation, value, pname)
-            except xlerrors.ExcelError as err:
-                return err
-        # 2. Run the function to compute the result.
+        return _apply_elementwise(kernel, values)
+
+    @functools.wraps(func)
+    def validate(*args, **kw):
         try:
-            res = func(*bound.args, **bound.kwargs)
+            if kernel is not None and (
+                any(isinstance(arg, xltypes.Array) for arg in args)
+                or any(isinstance(arg, xltypes.Array) for arg in kw.values())
+            ):
+                res = broadcast(args, kw)
+                if res is not None:
+                    return res
+            if kw or (varargs is None and len(args) > npositional):
+                # Generic (slower) path supporting keyword arguments.
+                bound = sig.bind(*args, **kw)
+                for pname, value in list(bound.arguments.items()):
+                    if isinstance(value, xlerrors.ExcelError):
+                        return value
+                    bound.arguments[pname] = by_name[pname](value)
+                res = func(*bound.args, **bound.kwargs)
+            else:
+                # 1. Convert all input parameters to Excel Types.
+                values = []
+                for cast, value in zip(positional, args):
+                    if isinstance(value, xlerrors.ExcelError):
+                        return value
+                    values.append(cast(value))
+                if len(args) > npositional:
+                    values.extend(varargs(args[npositional:]))
+                # 2. Run the function to compute the result.
+                res = func(*values)
         except xlerrors.ExcelError as err:
             # Never crash on Excel errors as we want to store them as the cell
             # value.
             return err
-        # 3. Convert the result to an Excel type.
-        return _validate(sig.return_annotation, res, 'return')
+        # 3. Convert the result to an Excel type. (Array results are
+        # evaluated elementwise.)
+        if isinstance(res, xltypes.Array):
+            return res
+        return return_cast(res)
 
     return validate
 
@@ -124,3 +581,82 @@ def flatten(values):
 
 def length(values):
     return len(flatten(values))
+
+
+def split_arrays(values):
+    """Split values into arrays (references) and direct values.
+
+    Python lists and tuples are flattened into direct values.
+    """
+    arrays = []
+    direct = []
+    for value in values:
+        if isinstance(value, xltypes.Array):
+            arrays.append(value)
+        elif isinstance(value, (list, tuple)):
+            sub_arrays, sub_direct = split_arrays(value)
+            arrays.extend(sub_arrays)
+            direct.extend(sub_direct)
+        else:
+            direct.append(value)
+    return arrays, direct
+
+
+def collect_numbers(values, integers=False):
+    """Collect the numbers to aggregate from function arguments.
+
+    Follows Excel's rules: arrays (references) only contribute their numbers
+    and date/times; booleans, text, blanks and errors in them are ignored.
+    Direct values are cast to numbers; blanks and values that cannot be
+    converted are skipped.
+
+    Returns a 1-D float64 ndarray. If `integers` is true, also returns a
+    boolean mask of the numbers that are integers (see `Number.is_whole`),
+    so that aggregates of integers can be returned as integers.
+    """
+    arrays, direct = split_arrays(values)
+    collected = []
+    whole = []
+    for array in arrays:
+        buffer = array.buffer
+        numeric = buffer.mask(xltypes.TAG_NUMBER, xltypes.TAG_DATETIME)
+        collected.append(buffer.numbers[numeric])
+        if integers and buffer.integers is not None:
+            whole.append(buffer.integers[numeric])
+        elif integers:
+            whole.append(numpy.zeros(collected[-1].size, dtype=bool))
+
+    numbers = []
+    for value in direct:
+        if isinstance(value, (xltypes.Blank, type(None))):
+            continue
+        try:
+            number = xltypes.Number.cast(value)
+        except xlerrors.ExcelError:
+            continue
+        numbers.append(float(number.value))
+        if integers:
+            whole.append(numpy.array([number.is_whole]))
+    collected.append(numpy.array(numbers, dtype=numpy.float64))
+
+    if integers:
+        whole.append(numpy.zeros(0, dtype=bool))
+        return numpy.concatenate(collected), numpy.concatenate(whole)
+    return numpy.concatenate(collected)
+
+
+def masked_numbers(array, mask):
+    """Return the numbers and date/times of the masked cells of an array.
+
+    Other cells are ignored, unless they are an error, which is raised (like
+    Excel does when aggregating cells selected by criteria).
+
+    Returns a 1-D float64 ndarray.
+    """
+    buffer = array.buffer
+    errors = mask & buffer.mask(xltypes.TAG_ERROR)
+    if errors.any():
+        code = buffer.errors[errors][0]
+        raise xlerrors.ERRORS_BY_CODE[xlerrors.ERROR_CODES[code]]()
+    mask = mask & buffer.mask(xltypes.TAG_NUMBER, xltypes.TAG_DATETIME)
+    return buffer.numbers[mask]
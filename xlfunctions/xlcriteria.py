@@ -1,8 +1,11 @@
+import functools
+import numpy
+import pandas
 import re
 
-from . import operator, xlerrors, xltypes
+from . import operator, utils, xl, xlerrors, xltypes
 
-CRITERIA_REGEX = r'(\W*)(.*)'
+CRITERIA_REGEX = r'(<=|>=|<>|<|>|=)?(.*)'
 
 CRITERIA_OPERATORS = {
     '<': operator.OP_LT,
@@ -13,39 +16,477 @@ CRITERIA_OPERATORS = {
     '>': operator.OP_GT,
 }
 
+# Maximum number of compiled criteria kept by `parse_criteria()`.
+CRITERIA_CACHE_SIZE = 1024
 
-def parse_criteria(criteria):
+_COMPARISONS = {
+    '<': numpy.less,
+    '<=': numpy.less_equal,
+    '=': numpy.equal,
+    '<>': numpy.equal,  # negated, see `Criterion._match()`
+    '>=': numpy.greater_equal,
+    '>': numpy.greater,
+}
 
-    if isinstance(criteria, (str, xltypes.Text)):
-        search = re.search(CRITERIA_REGEX, str(criteria)).group
-        str_operator, str_value = search(1), search(2)
+# Excel wildcards: "*" matches any sequence of characters, "?" any single
+# character and "~" escapes the next "*", "?" or "~".
+WILDCARD_REGEX = r'~[*?~]|[*?]'
+
+_WILDCARD_PATTERNS = {'*': '.*', '?': '.'}
+
+
+def _wildcard_pattern(text):
+    """Compile a text with wildcards into a case-insensitive regex."""
+    pattern = []
+    pos = 0
+    for match in re.finditer(WILDCARD_REGEX, text):
+        pattern.append(re.escape(text[pos:match.start()]))
+        token = match.group()
+        pattern.append(_WILDCARD_PATTERNS.get(token, re.escape(token[1:])))
+        pos = match.end()
+    pattern.append(re.escape(text[pos:]))
+    return re.compile(''.join(pattern), re.IGNORECASE | re.DOTALL)
+
+
+class Criterion:
+    """A compiled criterion, as used by `SUMIF()` and friends.
+
+    Follows Excel's matching rules: numbers (and date/times) only match
+    numeric cells, text matches text cells case-insensitively (with an empty
+    text also matching blank cells), booleans only match boolean cells and
+    errors match error cells with the same code. The `<>` operator matches
+    all cells that are not equal.
+
+    Text compared for (in)equality may contain wildcards, which are compiled
+    into a regex (see `pattern`).
+
+    A criterion can be called with a single value, or create a mask of all
+    cells of an array using `mask()`.
+    """
+
+    def __init__(self, operator, value):
+        self.operator = operator
+        self.value = value
+        self.pattern = None
+        if (isinstance(value, xltypes.Text) and operator in ('=', '<>')
+                and re.search(WILDCARD_REGEX, value.value)):
+            self.pattern = _wildcard_pattern(value.value)
+
+    def __call__(self, value):
+        values = numpy.empty((1, 1), dtype=object)
+        values[0, 0] = value
+        return bool(self._match(xltypes.ArrayBuffer.from_values(values))[0])
+
+    def mask(self, array):
+        """Return a flat (row-major) boolean mask of the matching cells."""
+        return self._match(array.buffer)
+
+    def _match(self, buffer):
+        tags = buffer.tags
+        value = self.value
+        compare = _COMPARISONS[self.operator]
+
+        if isinstance(value, xltypes.Number):
+            candidates = buffer.mask(xltypes.TAG_NUMBER, xltypes.TAG_DATETIME)
+            matches = candidates & compare(buffer.numbers, value.value)
+        elif isinstance(value, xltypes.Boolean):
+            candidates = tags == xltypes.TAG_BOOLEAN
+            matches = candidates & compare(buffer.numbers, float(value.value))
+        elif isinstance(value, xltypes.Text):
+            matches = self._match_texts(buffer, compare)
+        elif isinstance(value, xltypes.Blank):
+            matches = tags == xltypes.TAG_BLANK
+        else:
+            # Errors
+            code = xlerrors.ERROR_CODES.index(value.value)
+            matches = tags == xltypes.TAG_ERROR
+            if buffer.errors is not None:
+                matches[matches] = buffer.errors[matches] == code
+
+        if self.operator == '<>':
+            return ~matches
+        return matches
 
-        operator = CRITERIA_OPERATORS.get(str_operator)
-        if operator is None:
-            operator = CRITERIA_OPERATORS['=']
-            str_value = criteria
+    def index_keys(self):
+        """Return the keys of the cells matched by equality in a
+        `CriteriaIndex`, or `None` if the criterion is not an (in)equality
+        that can be looked up."""
+        if self.operator not in ('=', '<>') or self.pattern is not None:
+            return None
+        value = self.value
+        if isinstance(value, xltypes.Number):
+            return [('n', float(value.value))]
+        if isinstance(value, xltypes.Boolean):
+            return [('b', float(value.value))]
+        if isinstance(value, xltypes.Text):
+            if value.value == '':
+                return [('t', ''), ('blank',)]
+            return [('t', value.value)]
+        if isinstance(value, xltypes.Blank):
+            return [('blank',)]
+        return [('e', xlerrors.ERROR_CODES.index(value.value))]
 
-        value = str_value
-        for XlType in (xltypes.Number, xltypes.DateTime, xltypes.Boolean):
-            try:
-                value = XlType.cast(str_value)
-            except xlerrors.ValueExcelError:
-                pass
-            else:
-                break
+    def _match_texts(self, buffer, compare):
+        matches = numpy.zeros(buffer.size, dtype=bool)
+        texts = numpy.flatnonzero(buffer.tags == xltypes.TAG_TEXT)
+        if texts.size and self.pattern is not None:
+            matches[texts] = pandas.Series(
+                buffer.texts[texts]).str.fullmatch(self.pattern).to_numpy()
+        elif texts.size:
+            lowered = numpy.array(
+                [text.lower() for text in buffer.texts[texts]], dtype=object)
+            matches[texts] = compare(lowered, self.value.value).astype(bool)
+        if self.value.value == '' and self.operator in ('=', '<>'):
+            matches |= buffer.tags == xltypes.TAG_BLANK
+        return matches
 
-        def check(probe):
-            return operator(probe, value)
+    def __repr__(self):
+        return f'<Criterion {self.operator}{self.value!r}>'
 
-        return check
 
+def _parse_operand(operator, text):
+    if text.upper() in xlerrors.ERROR_CODES:
+        return xlerrors.ERRORS_BY_CODE[text.upper()]()
+    if text == '':
+        # "=" and "<>" only (don't) match blank cells; "" also matches empty
+        # text.
+        return xltypes.BLANK if operator else xltypes.Text('')
+    if text.lower() in xltypes.Text.boolean_texts:
+        return xltypes.Boolean(text.lower() == 'true')
+    try:
+        return xltypes.Number.cast(xltypes.Text(text))
+    except xlerrors.ValueExcelError:
+        return xltypes.Text(text.lower())
+
+
+@functools.lru_cache(maxsize=CRITERIA_CACHE_SIZE, typed=True)
+def _compile_criteria(criteria):
+    if isinstance(criteria, str):
+        search = re.fullmatch(CRITERIA_REGEX, criteria, re.DOTALL).group
+        str_operator, str_value = search(1), search(2)
+        return Criterion(
+            str_operator or '=', _parse_operand(str_operator, str_value))
+
+    if criteria is None:
+        # Excel treats a blank criteria cell like 0.
+        return Criterion('=', xltypes.Number(0))
+    if isinstance(criteria, xlerrors.ExcelError):
+        return Criterion('=', criteria)
+    criteria = xltypes.ExcelType.cast_from_native(criteria)
+    if isinstance(criteria, xltypes.DateTime):
+        criteria = criteria.__Number__()
+    return Criterion('=', criteria)
+
+
+def parse_criteria(criteria):
+    """Compile criteria into a `Criterion`.
+
+    Compiled criteria are cached, so that repeatedly used criteria are only
+    parsed once.
+    """
     criteria = xltypes.ExcelType.cast_from_native(criteria)
 
-    # No support for arrays right now.
     if isinstance(criteria, xltypes.Array):
-        raise xlerrors.ValueExcelError('Array criteria not supported.')
+        raise xlerrors.ValueExcelError(
+            'Array criteria must be parsed with parse_criteria_array().')
+
+    if isinstance(criteria, xltypes.ExcelType):
+        # Cache by native value.
+        criteria = criteria.value
+    return _compile_criteria(criteria)
+
+
+def parse_criteria_array(criteria):
+    """Compile each cell of an array of criteria into a `Criterion`, in
+    row-major order."""
+    return [parse_criteria(value) for value in criteria.flat]
+
+
+def criteria_mask(ranges_and_criteria, shape=None):
+    """Create the mask of cells matching all (criteria range, criteria)
+    pairs, as used by `SUMIFS()` and friends.
+
+    All criteria ranges must have the given shape (the shape of the first
+    one by default), otherwise a #VALUE! error is raised like in Excel.
+
+    Returns a flat (row-major) boolean mask.
+    """
+    if not ranges_and_criteria or len(ranges_and_criteria) % 2:
+        raise xlerrors.ValueExcelError(
+            'Criteria ranges and criteria must be given in pairs.')
+
+    mask = None
+    for range, criteria in zip(
+            ranges_and_criteria[::2], ranges_and_criteria[1::2]):
+        for value in (range, criteria):
+            if isinstance(value, xlerrors.ExcelError):
+                raise value
+        range = xltypes.Array.cast(range)
+        if shape is None:
+            shape = range.shape
+        if range.shape != shape:
+            raise xlerrors.ValueExcelError(
+                f'The shapes of the criteria ranges do not match. Looking '
+                f'for {shape} but given range has {range.shape}')
+        range_mask = parse_criteria(criteria).mask(range)
+        mask = range_mask if mask is None else mask & range_mask
+    return mask
+
+
+def _compensated_prefix_sums(values):
+    """Return prefix sums (starting with 0) of the values and their
+    rounding errors, so that the sum of `values[lo:hi]` is
+    `(sums[hi] - sums[lo]) + (errors[hi] - errors[lo])`."""
+    sums = numpy.concatenate(([0.0], numpy.cumsum(values)))
+    if not utils.COMPENSATED_SUMMATION:
+        return sums, numpy.zeros_like(sums)
+    # Error of each addition (Knuth's TwoSum).
+    previous = sums[:-1]
+    addend = sums[1:] - previous
+    errors = (previous - (sums[1:] - addend)) + (values - addend)
+    return sums, numpy.concatenate(([0.0], numpy.cumsum(errors)))
+
+
+class CriteriaIndex:
+    """Index of the cells of an array for criteria lookups.
+
+    Cells are grouped by the value equality criteria match (numbers, lower
+    case texts, booleans, blanks and errors) and ordered by group, with the
+    numeric cells first in ascending order. The cells matching an equality
+    criterion are then the range of its group, and those matching a numeric
+    inequality are found by binary search. Sums are differences of prefix
+    sums of the sum range in that order, which are cached per sum range.
+
+    The index is built on first use.
+    """
+
+    # Maximum number of sum ranges with cached prefix sums.
+    cache_size = 16
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.uses = 0
+        self._groups = None
+        self._cache = xl.LRUCache(self.cache_size)
+
+    def _build(self):
+        buffer = self.buffer
+        tags = buffer.tags
+        group_ids = numpy.full(buffer.size, -1, dtype=numpy.intp)
+        keys = []
+
+        numeric = numpy.flatnonzero(
+            buffer.mask(xltypes.TAG_NUMBER, xltypes.TAG_DATETIME))
+        values, inverse = numpy.unique(
+            buffer.numbers[numeric], return_inverse=True)
+        group_ids[numeric] = inverse
+        keys.extend(('n', value) for value in values.tolist())
+
+        booleans = numpy.flatnonzero(tags == xltypes.TAG_BOOLEAN)
+        for value in (0.0, 1.0):
+            cells = booleans[buffer.numbers[booleans] == value]
+            if cells.size:
+                group_ids[cells] = len(keys)
+                keys.append(('b', value))
+        blanks = numpy.flatnonzero(tags == xltypes.TAG_BLANK)
+        if blanks.size:
+            group_ids[blanks] = len(keys)
+            keys.append(('blank',))
+
+        texts = numpy.flatnonzero(tags == xltypes.TAG_TEXT)
+        if texts.size:
+            codes, uniques = pandas.factorize(
+                pandas.Series(buffer.texts[texts], dtype=object).str.lower())
+            group_ids[texts] = codes + len(keys)
+            keys.extend(('t', text) for text in uniques)
+        errors = numpy.flatnonzero(tags == xltypes.TAG_ERROR)
+        if errors.size:
+            codes, inverse = numpy.unique(
+                buffer.errors[errors], return_inverse=True)
+            group_ids[errors] = inverse + len(keys)
+            keys.extend(('e', code) for code in codes.tolist())
+
+        grouped = numpy.flatnonzero(group_ids >= 0)
+        order = grouped[numpy.argsort(group_ids[grouped], kind='stable')]
+        ends = numpy.cumsum(
+            numpy.bincount(group_ids[grouped], minlength=len(keys)))
+        starts = ends - numpy.bincount(
+            group_ids[grouped], minlength=len(keys))
+        self.order = order
+        self.numbers = buffer.numbers[order[:numeric.size]]
+        self.starts = starts.tolist()
+        self.ends = ends.tolist()
+        return {key: group for group, key in enumerate(keys)}
+
+    @property
+    def groups(self):
+        """Map of the (equality) keys of the cells to their group."""
+        if self._groups is None:
+            self._groups = self._build()
+        return self._groups
+
+    def _ranges(self, criterion):
+        """Return the ranges of the ordered cells matching the criterion,
+        ignoring `<>`, or `None` if the criterion cannot be looked up."""
+        keys = criterion.index_keys()
+        groups = self.groups
+        if keys is not None:
+            return [
+                (self.starts[groups[key]], self.ends[groups[key]])
+                for key in keys if key in groups
+            ]
+
+        operator = criterion.operator
+        if (not isinstance(criterion.value, xltypes.Number)
+                or operator not in ('<', '<=', '>', '>=')):
+            return None
+        value = criterion.value.value
+        side = 'right' if operator in ('>', '<=') else 'left'
+        bound = int(numpy.searchsorted(self.numbers, value, side=side))
+        if operator in ('>', '>='):
+            return [(bound, self.numbers.size)]
+        return [(0, bound)]
+
+    def _lookup(self, criteria):
+        """Return the ranges of the ordered cells matching the criteria and
+        the criterion each belongs to, or `None` if any of the criteria
+        cannot be looked up."""
+        lows = []
+        highs = []
+        owners = []
+        for idx, criterion in enumerate(criteria):
+            ranges = self._ranges(criterion)
+            if ranges is None:
+                return None
+            for low, high in ranges:
+                lows.append(low)
+                highs.append(high)
+                owners.append(idx)
+        negated = numpy.array(
+            [criterion.operator == '<>' for criterion in criteria],
+            dtype=bool)
+        return (
+            numpy.array(lows, dtype=numpy.intp),
+            numpy.array(highs, dtype=numpy.intp),
+            numpy.array(owners, dtype=numpy.intp),
+            negated
+        )
+
+    def counts(self, criteria):
+        """Count the cells matching each of the criteria, or return `None` if
+        any of them cannot be looked up."""
+        lookup = self._lookup(criteria)
+        if lookup is None:
+            return None
+        lows, highs, owners, negated = lookup
+        counts = numpy.bincount(
+            owners, weights=highs - lows, minlength=len(criteria))
+        counts[negated] = self.buffer.size - counts[negated]
+        return counts.astype(numpy.int64).tolist()
+
+    def count(self, criterion):
+        """Count the cells matching the criterion, or return `None` if it
+        cannot be looked up."""
+        counts = self.counts([criterion])
+        return None if counts is None else counts[0]
+
+    def _prefix_sums(self, sum_range):
+        # Like `SUMIF()`, cells beyond the end of the sum range are 0.
+        numbers = sum_range.cast_to_numbers().buffer.numbers
+        size = min(self.buffer.size, numbers.size)
+        values = numpy.zeros(self.buffer.size)
+        values[:size] = numbers[:size]
+        sums, errors = _compensated_prefix_sums(values[self.order])
+        return sums, errors, utils.sum_numbers(values)
+
+    def sums(self, criteria, sum_range):
+        """Sum the numbers of the sum range where the cells match each of the
+        criteria, or return `None` if any of them cannot be looked up."""
+        lookup = self._lookup(criteria)
+        if lookup is None:
+            return None
+        lows, highs, owners, negated = lookup
+        sums, errors, total = self._cache.get(
+            (sum_range.shape, sum_range.fingerprint),
+            lambda: self._prefix_sums(sum_range))
+        parts = (sums[highs] - sums[lows]) + (errors[highs] - errors[lows])
+        results = numpy.bincount(
+            owners, weights=parts, minlength=len(criteria))
+        results[negated] = total - results[negated]
+        return results.tolist()
+
+    def sum(self, criterion, sum_range):
+        """Sum the numbers of the sum range where the cells match the
+        criterion, or return `None` if it cannot be looked up."""
+        sums = self.sums([criterion], sum_range)
+        return None if sums is None else sums[0]
+
+
+# Criteria indexes of frozen arrays by their content. Set the size to 0 to
+# disable them.
+CRITERIA_INDEXES = xl.LRUCache(maxsize=16)
+
+# Indexes are only used once an array has been used this many times with
+# criteria, so that ranges used only once are simply scanned.
+CRITERIA_INDEX_MIN_USES = 2
+
+
+def criteria_index(array):
+    """Return the `CriteriaIndex` of an array, or `None` if it should not be
+    used."""
+    if not array.frozen or not CRITERIA_INDEXES.maxsize:
+        return None
+    index = CRITERIA_INDEXES.get(
+        (array.shape, array.fingerprint),
+        lambda: CriteriaIndex(array.buffer))
+    index.uses += 1
+    if index.uses < CRITERIA_INDEX_MIN_USES:
+        return None
+    return index
+
+
+def criteria_sums(range, criteria, sum_range):
+    """Sum the numbers of `sum_range` where the cells of `range` match each
+    of the criteria, as done by `SUMIF()`.
+
+    Several criteria are looked up in a `CriteriaIndex` of the range (built
+    in a single pass) instead of scanning the range for each of them.
+    """
+    index = criteria_index(range)
+    if index is None and len(criteria) > 1:
+        index = CriteriaIndex(range.buffer)
+    elif index is not None and not sum_range.frozen:
+        # Sums of mutable arrays must not be cached with a shared index.
+        index = None
+    if index is not None:
+        sums = index.sums(criteria, sum_range)
+        if sums is not None:
+            return sums
+
+    numbers = sum_range.cast_to_numbers().buffer.numbers
+    sums = []
+    for criterion in criteria:
+        mask = criterion.mask(range)
+        # Any range values that have indexes larger than sum_range's length
+        # are dropped.
+        size = min(mask.size, numbers.size)
+        sums.append(utils.sum_numbers(numbers[:size][mask[:size]]))
+    return sums
+
 
-    def check(x):
-        return x == criteria
+def criteria_counts(range, criteria):
+    """Count the cells of `range` matching each of the criteria, as done by
+    `COUNTIF()`.
 
-    return check
+    Like `criteria_sums()`, equality criteria and numeric inequalities are
+    counted from a `CriteriaIndex` of the range (the size of their groups)
+    when one is available.
+    """
+    index = criteria_index(range)
+    if index is None and len(criteria) > 1:
+        index = CriteriaIndex(range.buffer)
+    if index is not None:
+        counts = index.counts(criteria)
+        if counts is not None:
+            return counts
+    return [int(criterion.mask(range).sum()) for criterion in criteria]
@@ -1,21 +1,68 @@
 import datetime
 import dateutil
+import functools
+import hashlib
+import itertools
 import numpy
 import pandas
+import re
 from typing import Optional, Union, NewType
 
 from xlfunctions import utils, xlerrors
 
 NATIVE_TO_XLTYPE = {}
 
+# Cache of type to `TAG_*` mappings, see `ArrayBuffer`.
+_TAGS_BY_TYPE = {}
+
+# Integer `Number` instances in this range are interned.
+SMALL_NUMBER_RANGE = (-5, 256)
+
+# Dispatch table used by `ExcelType.cast_from_native()`. It maps a concrete
+# type directly to the callable producing the Excel type instance, so that no
+# failing casts or isinstance checks are needed on the hot path.
+_FROM_NATIVE_CASTS = {}
+
 
 def register(cls):
     for native_type in cls.native_types:
         NATIVE_TO_XLTYPE[native_type] = cls
+    _FROM_NATIVE_CASTS.clear()
+    _TAGS_BY_TYPE.clear()
     return cls
 
 
+def _identity(value):
+    return value
+
+
+def _number(value):
+    """Return the native number for a value.
+
+    Equivalent to `Number.cast(value).value`, but avoids creating
+    intermediate `Number` instances.
+    """
+    if isinstance(value, ExcelType):
+        return value.__number__()
+    vtype = type(value)
+    if vtype is int or vtype is float:
+        return value
+    return Number.cast(value).value
+
+
+def _from_native_cast(vtype):
+    if issubclass(
+            vtype,
+            (xlerrors.ExcelError,) + tuple(NATIVE_TO_XLTYPE.values())):
+        return _identity
+    return NATIVE_TO_XLTYPE[vtype]
+
+
 class ExcelType:
+    """Base class of all Excel types.
+
+    Instances are immutable, so that commonly used values can be shared.
+    """
 
     __slots__ = ('value')
 
@@ -26,9 +73,18 @@ class ExcelType:
     def __new__(cls, value):
         inst = super().__new__(cls)
         assert isinstance(value, cls.native_types), value
-        inst.value = value
+        object.__setattr__(inst, 'value', value)
         return inst
 
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            f'{self.__class__.__name__} instances are immutable.')
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        return (self.__class__, (self.value,))
+
     @classmethod
     def cast(cls, value):
         if isinstance(value, cls):
@@ -46,32 +102,32 @@ class ExcelType:
 
     @classmethod
     def cast_from_native(cls, value):
-        if isinstance(value, xlerrors.ExcelError):
-            return value
-        if isinstance(value, tuple(NATIVE_TO_XLTYPE.values())):
-            return value
-        return NATIVE_TO_XLTYPE[type(value)](value)
+        vtype = type(value)
+        cast = _FROM_NATIVE_CASTS.get(vtype)
+        if cast is None:
+            cast = _FROM_NATIVE_CASTS[vtype] = _from_native_cast(vtype)
+        return cast(value)
 
     def _sort_key(self, other):
         return (self.sort_precedence, self.value)
 
     def __add__(self, other):
-        return Number(Number.cast(self).value + Number.cast(other).value)
+        return Number(_number(self) + _number(other))
 
     def __sub__(self, other):
-        return Number(Number.cast(self).value - Number.cast(other).value)
+        return Number(_number(self) - _number(other))
 
     def __mul__(self, other):
-        return Number(Number.cast(self).value * Number.cast(other).value)
+        return Number(_number(self) * _number(other))
 
     def __truediv__(self, other):
-        ovalue = float(Number.cast(other))
+        ovalue = float(_number(other))
         if ovalue == 0:
             raise xlerrors.DivZeroExcelError()
-        return Number(float(Number.cast(self)) / ovalue)
+        return Number(float(_number(self)) / ovalue)
 
     def __pow__(self, other):
-        return Number(Number.cast(self).value ** Number.cast(other).value)
+        return Number(_number(self) ** _number(other))
 
     def __and__(self, other):
         # Highjacking bitwise "and" to implement logical "and"
@@ -164,10 +220,18 @@ class ExcelType:
 @register
 class Number(ExcelType):
 
+    __slots__ = ()
+
     native_types = (int, float, numpy.int64, numpy.float64)
 
     blank_value = 0
 
+    def __new__(cls, value):
+        if (cls is Number and type(value) is int
+                and SMALL_NUMBER_RANGE[0] <= value <= SMALL_NUMBER_RANGE[1]):
+            return _SMALL_NUMBERS[value - SMALL_NUMBER_RANGE[0]]
+        return super().__new__(cls, value)
+
     @property
     def is_whole(self):
         return isinstance(self.value, int)
@@ -177,7 +241,7 @@ class Number(ExcelType):
         return isinstance(self.value, float)
 
     def __mod__(self, other):
-        return Number(self.value % Number.cast(other).value)
+        return Number(self.value % _number(other))
 
     __rmod__ = __mod__
 
@@ -209,36 +273,122 @@ class Number(ExcelType):
         return self.__class__(0)
 
 
+# Maximum number of texts with cached conversions to numbers and date/times.
+TEXT_CAST_CACHE_SIZE = 4096
+
+# Words which can make a text a number or date/time: month and weekday names
+# (parsed by dateutil), nan/inf(inity) (parsed by float()) and booleans.
+_CAST_WORDS = frozenset(
+    [name.lower() for names in dateutil.parser.parserinfo.MONTHS
+     for name in names]
+    + [name.lower() for names in dateutil.parser.parserinfo.WEEKDAYS
+       for name in names]
+    + ['nan', 'inf', 'infinity', 'true', 'false']
+)
+# Further words which may be part of numbers or date/times with digits: the
+# exponent of floats, the ISO date/time separator and the words dateutil
+# understands besides month and weekday names (skipped words, ordinal
+# suffixes, units, am/pm and time zone names).
+_NUMBER_WORDS = frozenset(
+    [word.lower() for word in (
+        dateutil.parser.parserinfo.JUMP
+        + dateutil.parser.parserinfo.PERTAIN
+        + dateutil.parser.parserinfo.UTCZONE
+        + list(dateutil.parser.parserinfo.TZOFFSET))]
+    + [name for names in dateutil.parser.parserinfo.HMS for name in names]
+    + [name for names in dateutil.parser.parserinfo.AMPM for name in names]
+    + ['e', 't']
+)
+_DIGIT_REGEX = re.compile(r'\d')
+_WORD_REGEX = re.compile(r'[^\W\d_]+')
+
+
+def _could_be_number(text):
+    """Cheaply tell whether a text might be converted to a number or
+    date/time, i.e. whether it is worth parsing.
+
+    Texts with other words than those known by float() and dateutil (e.g.
+    labels like "Item 12") cannot be.
+    """
+    words = _WORD_REGEX.findall(text.lower())
+    if not all(word in _CAST_WORDS or word in _NUMBER_WORDS
+               for word in words):
+        return False
+    return bool(_DIGIT_REGEX.search(text)) or any(
+        word in _CAST_WORDS for word in words)
+
+
+@functools.lru_cache(maxsize=TEXT_CAST_CACHE_SIZE)
+def _text_to_datetime(text, today):
+    """Convert a text to a date/time, or return `None` if it cannot be.
+
+    Missing parts of dates (e.g. of "May") are taken from `today`, which is
+    passed in, rather than read by dateutil, so that it is part of the cache
+    key and texts are not converted with a stale date.
+    """
+    if not _could_be_number(text):
+        return None
+    try:
+        return utils.number_to_datetime(float(text))
+    except (ValueError, OverflowError):
+        pass
+    try:
+        return dateutil.parser.parse(
+            text, default=datetime.datetime.combine(today, datetime.time()))
+    except (ValueError, OverflowError):
+        return None
+
+
+@functools.lru_cache(maxsize=TEXT_CAST_CACHE_SIZE)
+def _text_to_number(text, today):
+    """Convert a text to a number, or return `None` if it cannot be.
+
+    `today` is used for dates as with `_text_to_datetime()`.
+    """
+    if not _could_be_number(text):
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    # For arithmetic, boolean text is actually interpreted.
+    if text.lower() in Text.boolean_texts:
+        return int(text.lower() == 'true')
+    # The text might represent a date/time, which can be converted.
+    value = _text_to_datetime(text, today)
+    if value is None:
+        return None
+    return utils.datetime_to_number(value)
+
+
+def _is_exact_integer(number):
+    """Whether a number is an integer that a float represents exactly."""
+    return (
+        isinstance(number, (int, numpy.integer))
+        and not isinstance(number, bool)
+        and -2 ** 53 <= number <= 2 ** 53)
+
+
 @register
 class Text(ExcelType):
 
+    __slots__ = ()
+
     boolean_texts = ['false', 'true']
 
     native_types = (str,)
     sort_precedence = 1
 
     def __number__(self):
-        try:
-            return int(self.value)
-        except ValueError:
-            pass
-        try:
-            return float(self.value)
-        except ValueError:
-            pass
-        # For arithmetic, boolean text is actually interpreted.
-        try:
-            return int(self.__bool__(by_content_only=True))
-        except xlerrors.ValueExcelError:
-            pass
-        # Try casting to datetime first, since the string might represent one
-        # and that can be concerted.
-        try:
-            return utils.datetime_to_number(self.__datetime__())
-        except xlerrors.ValueExcelError:
-            pass
-        raise xlerrors.ValueExcelError(
-            f'Could not convert {repr(self.value)} to float.')
+        number = _text_to_number(self.value, datetime.date.today())
+        if number is None:
+            raise xlerrors.ValueExcelError(
+                f'Could not convert {repr(self.value)} to float.')
+        return number
 
     def __bool__(self, by_content_only=False):
         if self.value.lower() in self.boolean_texts:
@@ -252,17 +402,12 @@ class Text(ExcelType):
         return Boolean(self.__bool__(by_content_only=True))
 
     def __datetime__(self):
-        try:
-            return utils.number_to_datetime(float(self.value))
-        except (ValueError, OverflowError):
-            pass
-        try:
-            return dateutil.parser.parse(self.value)
-        except (ValueError, OverflowError):
-            pass
-        raise xlerrors.ValueExcelError(
-            f'Could not cast {repr(self.value)} (of type {type(self.value)} '
-            f'to date/time.')
+        value = _text_to_datetime(self.value, datetime.date.today())
+        if value is None:
+            raise xlerrors.ValueExcelError(
+                f'Could not cast {repr(self.value)} (of type '
+                f'{type(self.value)} to date/time.')
+        return value
 
     def __Blank__(self):
         return self.__class__('')
@@ -271,11 +416,18 @@ class Text(ExcelType):
 @register
 class Boolean(ExcelType):
 
+    __slots__ = ()
+
     native_types = (bool,)
     sort_precedence = 2
     datetime_true = datetime.datetime(1999, 12, 31)
     datetime_false = datetime.datetime(1999, 12, 30)
 
+    def __new__(cls, value):
+        if cls is Boolean and type(value) is bool:
+            return TRUE if value else FALSE
+        return super().__new__(cls, value)
+
     def _sort_key(self, other):
         return (self.sort_precedence, int(self.value))
 
@@ -295,6 +447,8 @@ class Boolean(ExcelType):
 @register
 class DateTime(ExcelType):
 
+    __slots__ = ()
+
     native_types = (datetime.datetime, numpy.datetime64)
 
     def _sort_key(self, other):
@@ -304,7 +458,10 @@ class DateTime(ExcelType):
         return int(float(self))
 
     def __float__(self):
-        return utils.datetime_to_number(self.value)
+        value = self.value
+        if isinstance(value, numpy.datetime64):
+            value = pandas.Timestamp(value).to_pydatetime(warn=False)
+        return utils.datetime_to_number(value)
 
     __number__ = __float__
 
@@ -321,9 +478,13 @@ class DateTime(ExcelType):
 @register
 class Blank(ExcelType):
 
+    __slots__ = ()
+
     native_types = (type(None),)
 
     def __new__(cls, value=None):
+        if cls is Blank:
+            return BLANK
         return super().__new__(cls, None)
 
     @classmethod
@@ -362,7 +523,14 @@ class Blank(ExcelType):
         return '<BLANK>'
 
 
-BLANK = Blank()
+# Shared instances of the most common values.
+BLANK = ExcelType.__new__(Blank, None)
+TRUE = ExcelType.__new__(Boolean, True)
+FALSE = ExcelType.__new__(Boolean, False)
+_SMALL_NUMBERS = tuple(
+    ExcelType.__new__(Number, value)
+    for value in range(SMALL_NUMBER_RANGE[0], SMALL_NUMBER_RANGE[1] + 1)
+)
 
 
 def _safe_cast(func, empty_value=None):
@@ -387,46 +555,529 @@ def _convert_nested_list(value):
     return [_convert_nested_list(item) for item in value]
 
 
+def _object_array(items, shape):
+    """Create an object ndarray of the given shape from an iterable."""
+    try:
+        # Unlike `numpy.array()`, this does not probe the items for being
+        # array-like themselves, which is both faster and keeps nested arrays
+        # intact.
+        return numpy.fromiter(
+            items, dtype=object, count=shape[0] * shape[1]).reshape(shape)
+    except ValueError:
+        # Older numpy versions cannot create object arrays from iterators.
+        values = numpy.empty(shape[0] * shape[1], dtype=object)
+        for idx, item in enumerate(items):
+            values[idx] = item
+        return values.reshape(shape)
+
+
+def _to_ndarray(data):
+    """Convert nested lists into a 2-D object ndarray of Excel types."""
+    if isinstance(data, numpy.ndarray):
+        data = data.tolist()
+    if not isinstance(data, (list, tuple)):
+        raise xlerrors.ValueExcelError(f'Invalid array argument: {data}')
+
+    rows = _convert_nested_list(data)
+    if not rows:
+        return numpy.empty((0, 0), dtype=object)
+
+    is_row = [isinstance(row, list) for row in rows]
+    if not any(is_row):
+        # A flat list is a single column.
+        rows = [[item] for item in rows]
+    elif not all(is_row) or len(set(map(len, rows))) != 1:
+        raise xlerrors.ValueExcelError(f'Invalid array argument: {data}')
+
+    return _object_array(
+        itertools.chain.from_iterable(rows), (len(rows), len(rows[0])))
+
+
+# Type tags of the cells in an `ArrayBuffer`.
+TAG_NUMBER = 0
+TAG_TEXT = 1
+TAG_BOOLEAN = 2
+TAG_BLANK = 3
+TAG_ERROR = 4
+TAG_DATETIME = 5
+TAG_OTHER = 6
+
+_ERROR_CODE_INDEXES = {
+    code: idx for idx, code in enumerate(xlerrors.ERROR_CODES)}
+
+
+def _type_tag(vtype):
+    tag = _TAGS_BY_TYPE.get(vtype)
+    if tag is not None:
+        return tag
+    xltype = NATIVE_TO_XLTYPE.get(vtype, vtype)
+    tag = TAG_OTHER
+    for cls, cls_tag in ((Number, TAG_NUMBER), (Text, TAG_TEXT),
+                         (Boolean, TAG_BOOLEAN), (Blank, TAG_BLANK),
+                         (DateTime, TAG_DATETIME),
+                         (xlerrors.ExcelError, TAG_ERROR)):
+        if issubclass(xltype, cls):
+            tag = cls_tag
+            break
+    _TAGS_BY_TYPE[vtype] = tag
+    return tag
+
+
+class ArrayBuffer:
+    """Columnar storage of the cells of an array.
+
+    All cells are stored in flat (row-major) numpy arrays:
+
+    - `numbers`: float64 values of numbers, booleans and date/times;
+      0.0 for all other cells.
+    - `tags`: the `TAG_*` type tag of each cell.
+    - `errors`: index into `xlerrors.ERROR_CODES` for error cells.
+    - `texts`: the string of text cells (object array), or `None` if there
+      are no text cells.
+    - `integers`: whether number cells hold an `int` (boolean array), so
+      that they are recreated as such; or `None` if none do.
+    """
+
+    __slots__ = ('shape', 'numbers', 'tags', 'errors', 'texts', 'integers')
+
+    def __init__(
+            self, shape, numbers, tags, errors=None, texts=None,
+            integers=None
+    ):
+        self.shape = shape
+        self.numbers = numbers
+        self.tags = tags
+        self.errors = errors
+        self.texts = texts
+        self.integers = integers
+        for array in (numbers, tags, errors, texts, integers):
+            if array is not None:
+                array.setflags(write=False)
+
+    @classmethod
+    def from_values(cls, values):
+        """Create a buffer from a 2-D ndarray of Excel types."""
+        numbers = []
+        tags = []
+        errors = {}
+        texts = {}
+        integers = []
+        for idx, item in enumerate(values.flat):
+            tag = _type_tag(type(item))
+            tags.append(tag)
+            if tag == TAG_OTHER:
+                numbers.append(0.0)
+                continue
+            if tag == TAG_ERROR:
+                numbers.append(0.0)
+                errors[idx] = _ERROR_CODE_INDEXES.get(
+                    item.value, _ERROR_CODE_INDEXES[xlerrors.ERROR_CODE_VALUE])
+                continue
+            if not isinstance(item, ExcelType):
+                item = ExcelType.cast_from_native(item)
+            if tag == TAG_TEXT:
+                numbers.append(0.0)
+                texts[idx] = item.value
+            else:
+                number = item.__number__()
+                numbers.append(float(number))
+                if tag == TAG_NUMBER and _is_exact_integer(number):
+                    integers.append(idx)
+
+        size = len(tags)
+        error_codes = None
+        if errors:
+            error_codes = numpy.zeros(size, dtype=numpy.int8)
+            error_codes[list(errors)] = list(errors.values())
+        text_values = None
+        if texts:
+            text_values = numpy.empty(size, dtype=object)
+            text_values[list(texts)] = list(texts.values())
+        integer_mask = None
+        if integers:
+            integer_mask = numpy.zeros(size, dtype=bool)
+            integer_mask[integers] = True
+        return cls(
+            values.shape,
+            numpy.array(numbers, dtype=numpy.float64),
+            numpy.array(tags, dtype=numpy.int8),
+            error_codes, text_values, integer_mask)
+
+    @classmethod
+    def from_numbers(cls, numbers):
+        """Create a buffer from a 1-D or 2-D numeric ndarray."""
+        numbers = numpy.asarray(numbers, dtype=numpy.float64)
+        if numbers.ndim == 1:
+            numbers = numbers.reshape(-1, 1)
+        return cls(
+            numbers.shape, numbers.ravel(),
+            numpy.full(numbers.size, TAG_NUMBER, dtype=numpy.int8))
+
+    @classmethod
+    def from_booleans(cls, booleans):
+        """Create a buffer from a 1-D or 2-D boolean ndarray."""
+        booleans = numpy.asarray(booleans, dtype=bool)
+        if booleans.ndim == 1:
+            booleans = booleans.reshape(-1, 1)
+        return cls(
+            booleans.shape, booleans.ravel().astype(numpy.float64),
+            numpy.full(booleans.size, TAG_BOOLEAN, dtype=numpy.int8))
+
+    @property
+    def size(self):
+        return self.tags.size
+
+    def vector(self, index, axis=0):
+        """Return the buffer of a row (`axis` 0) or column (`axis` 1).
+
+        The arrays of the new buffer are views of the arrays of this buffer,
+        so that no cells are copied.
+        """
+        rows, cols = self.shape
+        if axis == 0:
+            key, shape = (index, slice(None)), (1, cols)
+        else:
+            key, shape = (slice(None), index), (rows, 1)
+
+        def view(array):
+            if array is None:
+                return None
+            return array.reshape(self.shape)[key]
+
+        return ArrayBuffer(
+            shape, view(self.numbers), view(self.tags), view(self.errors),
+            view(self.texts), view(self.integers))
+
+    def mask(self, *tags):
+        """Return a flat boolean mask of all cells having one of the tags."""
+        mask = self.tags == tags[0]
+        for tag in tags[1:]:
+            mask |= self.tags == tag
+        return mask
+
+    def to_values(self):
+        """Create the 2-D ndarray of Excel types represented by the buffer."""
+        numbers = self.numbers.tolist()
+        if self.integers is not None:
+            numbers = [
+                int(number) if integer else number
+                for number, integer in zip(numbers, self.integers.tolist())
+            ]
+        if not (self.tags != TAG_NUMBER).any():
+            return _object_array(map(Number, numbers), self.shape)
+
+        items = []
+        for idx, tag in enumerate(self.tags.tolist()):
+            if tag == TAG_NUMBER:
+                items.append(Number(numbers[idx]))
+            elif tag == TAG_TEXT:
+                items.append(Text(self.texts[idx]))
+            elif tag == TAG_BOOLEAN:
+                items.append(Boolean(bool(numbers[idx])))
+            elif tag == TAG_BLANK:
+                items.append(BLANK)
+            elif tag == TAG_ERROR:
+                code = xlerrors.ERROR_CODES[self.errors[idx]]
+                items.append(xlerrors.ERRORS_BY_CODE[code]())
+            elif tag == TAG_DATETIME:
+                items.append(DateTime(utils.number_to_datetime(numbers[idx])))
+            else:
+                raise ValueError(
+                    f'Cannot create a value for cell {idx} with tag {tag}.')
+        return _object_array(items, self.shape)
+
+
+def _cached(func):
+    """Cache the result of an `Array` method without arguments."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def cached(self):
+        cache = self._cache
+        if cache is None:
+            cache = self._cache = {}
+        if name not in cache:
+            cache[name] = func(self)
+        return cache[name]
+
+    return cached
+
+
 @register
-class Array(pandas.DataFrame):
+class Array:
+    """Excel array (or range).
+
+    Instantiating `Array` creates an instance of the implementation selected
+    by `ARRAY_BACKEND`. All implementations provide `values` (a 2-D object
+    ndarray of Excel types), `shape` and the methods below.
+
+    Arrays are considered immutable after construction, so that all derived
+    views (flat list, buffer, casts) are computed only once. Those views must
+    not be modified either.
+    """
 
     native_types = (list, tuple)
 
-    def __init__(self, data, *args, **kw):
-        try:
-            super().__init__(_convert_nested_list(data), *args, **kw)
-        except ValueError:
-            raise xlerrors.ValueExcelError(f'Invalid array argument: {data}')
+    # Frozen arrays are guaranteed to never change, which makes them hashable
+    # and safe to share (e.g. between threads or as cache keys).
+    frozen = False
+
+    _buffer = None
+    _cache = None
+
+    def __new__(cls, *args, **kw):
+        if cls is Array:
+            cls = ARRAY_BACKENDS[ARRAY_BACKEND]
+        return super().__new__(cls)
+
+    @classmethod
+    def _from_values(cls, values):
+        """Create an array from a 2-D ndarray that already holds Excel
+        types."""
+        return cls(values)
+
+    @classmethod
+    def _from_buffer(cls, buffer):
+        inst = cls._from_values(buffer.to_values())
+        inst._buffer = buffer
+        return inst
+
+    @classmethod
+    def from_numbers(cls, numbers):
+        """Create an array of numbers from a 1-D or 2-D numeric ndarray.
+
+        With the numpy backend no `Number` instances are created until the
+        values are accessed.
+        """
+        return cls.from_buffer(ArrayBuffer.from_numbers(numbers))
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """Create an array from an `ArrayBuffer`."""
+        if cls is Array:
+            cls = ARRAY_BACKENDS[ARRAY_BACKEND]
+        return cls._from_buffer(buffer)
 
     @property
-    def _constructor(self):
-        return Array
+    def buffer(self):
+        """Columnar `ArrayBuffer` representation of the array."""
+        if self._buffer is None:
+            self._buffer = ArrayBuffer.from_values(self.values)
+        return self._buffer
 
     @property
+    @_cached
     def flat(self):
-        return list(self.values.flat)
+        return self.values.ravel().tolist()
+
+    @property
+    @_cached
+    def fingerprint(self):
+        """Digest of the shape, types and values of all cells."""
+        buffer = self.buffer
+        digest = hashlib.blake2b(repr(buffer.shape).encode(), digest_size=16)
+        digest.update(buffer.tags.tobytes())
+        # Adding 0.0 normalizes -0.0 to 0.0.
+        digest.update((buffer.numbers + 0.0).tobytes())
+        if buffer.errors is not None:
+            digest.update(buffer.errors.tobytes())
+        if buffer.integers is not None:
+            digest.update(buffer.integers.tobytes())
+        if buffer.texts is not None:
+            texts = buffer.texts[buffer.mask(TAG_TEXT)].tolist()
+            digest.update(repr(texts).encode('utf-8', 'surrogatepass'))
+        # Date/times are not exactly represented by their number; and nothing
+        # is known about other objects but their identity.
+        others = numpy.flatnonzero(buffer.mask(TAG_DATETIME, TAG_OTHER))
+        if others.size:
+            digest.update(repr([
+                # `Timestamp` also normalizes `numpy.datetime64` values.
+                pandas.Timestamp(item.value).isoformat()
+                if isinstance(item, DateTime) else id(item)
+                for item in self.values.flat[others]
+            ]).encode())
+        return digest.digest()
+
+    def freeze(self):
+        """Return a frozen array with the same content."""
+        if self.frozen:
+            return self
+        return NumpyArray._from_values(numpy.array(self.values, dtype=object))
+
+    def vector(self, index, axis=0):
+        """Return a row (`axis` 0) or column (`axis` 1) of the array.
+
+        With the numpy backend the cells and the buffer (whichever already
+        exist) of the new array are views of those of this array, so that
+        nothing is copied or created.
+        """
+        key = slice(index, index + 1)
+        inst = self._from_values(
+            self.values[key] if axis == 0 else self.values[:, key])
+        if self._buffer is not None:
+            inst._buffer = self._buffer.vector(index, axis)
+        return inst
+
+    @property
+    @_cached
+    def first_error(self):
+        """The first Excel error in the array or `None`."""
+        errors = numpy.flatnonzero(self.buffer.mask(TAG_ERROR))
+        if not errors.size:
+            return None
+        return self.values.flat[errors[0]]
 
     @classmethod
     def cast(cls, value):
-        if isinstance(value, cls):
+        if isinstance(value, Array):
             return value
         if not isinstance(value, cls.native_types):
             value = [[value]]
         return Array(value)
 
+    @_cached
+    def _flat_numbers(self):
+        return list(map(_safe_cast(Number.cast, None), self.flat))
+
     def flatten(self, xltype=None, filt=None):
-        cast = _safe_cast(Number.cast, None) \
-            if xltype is not None else lambda x: x
-        return list(filter(filt, [cast(item) for item in self.values.flat]))
+        items = self._flat_numbers() if xltype is not None else self.flat
+        return list(filter(filt, items))
 
-    def cast_to_numbers(self):
-        return self.applymap(_safe_cast(Number.cast, Number(0.0)))
+    def _map(self, func):
+        return self._from_values(_object_array(
+            map(func, self.values.flat), self.shape))
 
+    @_cached
+    def cast_to_numbers(self):
+        buffer = self.buffer
+        numbers = buffer.numbers.copy()
+        # Like `Number.cast()`, booleans and integer texts become integers.
+        integers = buffer.mask(TAG_BOOLEAN)
+        if buffer.integers is not None:
+            integers |= buffer.integers
+        today = datetime.date.today()
+        for idx in numpy.flatnonzero(buffer.mask(TAG_TEXT)):
+            number = _text_to_number(buffer.texts[idx], today)
+            if number is not None:
+                numbers[idx] = number
+                integers[idx] = _is_exact_integer(number)
+        return self._from_buffer(ArrayBuffer(
+            buffer.shape, numbers,
+            numpy.full(buffer.size, TAG_NUMBER, dtype=numpy.int8),
+            integers=integers if integers.any() else None))
+
+    @_cached
     def cast_to_booleans(self):
-        return self.applymap(_safe_cast(Boolean.cast, Boolean(True)))
-
+        buffer = self.buffer
+        booleans = numpy.ones(buffer.size, dtype=bool)
+        numeric = buffer.mask(TAG_NUMBER, TAG_BOOLEAN)
+        booleans[numeric] = buffer.numbers[numeric] != 0
+        booleans[buffer.mask(TAG_BLANK)] = False
+        for idx in numpy.flatnonzero(buffer.mask(TAG_TEXT)):
+            text = buffer.texts[idx].lower()
+            if text in Text.boolean_texts:
+                booleans[idx] = (text == 'true')
+        return self._from_buffer(
+            ArrayBuffer.from_booleans(booleans.reshape(buffer.shape)))
+
+    @_cached
     def cast_to_texts(self):
-        return self.applymap(_safe_cast(Text.cast, Text('')))
+        return self._map(_safe_cast(Text.cast, Text('')))
+
+    def to_frame(self):
+        """Return the array as a (plain) pandas data frame."""
+        return pandas.DataFrame(self.values)
+
+
+class NumpyArray(Array):
+    """Array backed by a 2-D numpy object array and/or an `ArrayBuffer`.
+
+    When created from a buffer, the object array is only created when
+    `values` is accessed.
+    """
+
+    frozen = True
+
+    _values = None
+
+    def __init__(self, data):
+        self._values = _to_ndarray(data)
+        self._values.setflags(write=False)
+
+    @classmethod
+    def _from_values(cls, values):
+        inst = cls.__new__(cls)
+        inst._values = values
+        values.setflags(write=False)
+        return inst
+
+    @classmethod
+    def _from_buffer(cls, buffer):
+        inst = cls.__new__(cls)
+        inst._buffer = buffer
+        return inst
+
+    @property
+    def values(self):
+        if self._values is None:
+            self._values = self._buffer.to_values()
+            self._values.setflags(write=False)
+        return self._values
+
+    def vector(self, index, axis=0):
+        if self._values is None:
+            return self._from_buffer(self._buffer.vector(index, axis))
+        return super().vector(index, axis)
+
+    @property
+    def shape(self):
+        if self._values is None:
+            return self._buffer.shape
+        return self._values.shape
+
+    def __getitem__(self, column):
+        # Columns first, as with pandas data frames.
+        return self.values[:, column]
+
+    def __eq__(self, other):
+        if not isinstance(other, Array):
+            return NotImplemented
+        return self is other or (
+            self.shape == other.shape
+            and self.fingerprint == other.fingerprint)
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} {self.values.tolist()!r}>'
+
+
+class DataFrameArray(Array, pandas.DataFrame):
+    """Array implemented as a pandas data frame.
+
+    Note: Modifying the data frame in place does not invalidate the cached
+    views of the array.
+    """
+
+    def __init__(self, data, *args, **kw):
+        try:
+            super().__init__(_convert_nested_list(data), *args, **kw)
+        except ValueError:
+            raise xlerrors.ValueExcelError(f'Invalid array argument: {data}')
+
+    @property
+    def _constructor(self):
+        return DataFrameArray
+
+
+# Available array implementations. `ARRAY_BACKEND` selects the one to use
+# when creating new arrays and can be changed at runtime.
+ARRAY_BACKENDS = {
+    'numpy': NumpyArray,
+    'pandas': DataFrameArray,
+}
+ARRAY_BACKEND = 'numpy'
 
 
 class Expr: